@@ -6,15 +6,48 @@
 import os
 import sys
 import shutil
+import hashlib
+import argparse
 import subprocess
+import importlib.util
 import PyInstaller.__main__
 from datetime import datetime
+from src import __version__
+
+# 构建脚本所在目录（项目根目录）
+_HERE = os.path.dirname(os.path.abspath(__file__))
 
 # 应用程序配置
 APP_NAME = "ScreenshotTool"
-APP_VERSION = "1.0.4"  # 更新版本号到1.0.4
+APP_VERSION = __version__  # 版本号在 src/__init__.py 中维护
 MAIN_SCRIPT = "run.py"  # 使用正确的入口点脚本
 OUTPUT_DIR = "dist"
+NUITKA_OUTPUT_DIR = "dist_nuitka"  # Nuitka 构建输出目录
+BUILD_ENGINES = ("pyinstaller", "nuitka")
+VERSION_FILE = "version_info.txt"  # 版本信息文件，内容不变时保留，避免 PyInstaller 重新生成 EXE
+_BUILD_YEAR = datetime.now().year
+# Windows 版本资源要求四段数字版本号
+_VERSION_TUPLE = tuple(([int(part) for part in APP_VERSION.split('.')] + [0, 0, 0, 0])[:4])
+BUILD_CACHE_DIR = ".build_cache"  # 构建缓存目录
+REQUIREMENTS_STAMP = os.path.join(BUILD_CACHE_DIR, "requirements.stamp")
+BUILD_INPUTS_STAMP = os.path.join(BUILD_CACHE_DIR, "build_inputs.stamp")
+WORK_DIR = ".pyinstaller_work"  # PyInstaller 的 spec 文件和中间文件统一放在该目录
+SPEC_FILE = os.path.join(WORK_DIR, APP_NAME + ".spec")  # 输入未变化时直接复用
+SOURCE_DIR = "src"
+# 每次调用系统删除命令时命令行的最大长度（字符），cmd.exe 的限制为 8191，POSIX 的 ARG_MAX 通常远大于此
+RM_CMDLINE_LIMIT = 8000 if os.name == 'nt' else 100000
+LEGACY_BUILD_DIR = "build"  # 早期版本 PyInstaller 的中间文件目录，其中残留的文件不再使用
+PACK_MODES = ("onedir", "onefile")  # onedir 启动时无需自解压，默认使用
+UPX_DIR = os.path.join(_HERE, "upx")  # UPX 可执行文件所在目录，仅在 --compress 时使用
+# 压缩后无法正常加载或收益很小的 DLL，不使用 UPX 压缩
+UPX_EXCLUDES = [
+    "Qt5Core.dll",
+    "Qt5Gui.dll",
+    "Qt5Widgets.dll",
+    "python3.dll",
+    f"python3{sys.version_info.minor}.dll",
+    "vcruntime140.dll",
+]
 
 # 最近的更新:
 # 1.0.4 - 修复悬浮球模式自动退出问题，支持管理员权限运行使全局快捷键更可靠
@@ -23,57 +56,173 @@ OUTPUT_DIR = "dist"
 # 1.0.1 - 修复了程序退出时keyboard模块的清理错误
 # 1.0.0 - 初始版本
 
-def clean_build_directories():
+def _fast_rmtree(path):
+    """
+    基于 os.scandir 递归删除目录
+    每个条目只需一次 stat（DirEntry 自带类型信息），不会跟随符号链接
+    
+    参数:
+        path: 要删除的目录路径
+    """
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                _fast_rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+    os.rmdir(path)
+
+def _fast_rm(paths):
+    """
+    使用系统原生命令批量删除目录
+    POSIX 下调用 rm -rf，Windows 下调用 rd /s /q，失败时回退到 _fast_rmtree
+    按命令行长度分批调用，不超过 RM_CMDLINE_LIMIT
+    
+    参数:
+        paths: 要删除的目录路径列表
+    """
+    if os.name == 'nt':
+        base_cmd = ['cmd', '/c', 'rd', '/s', '/q']
+    else:
+        base_cmd = ['rm', '-rf', '--']
+    base_len = len(' '.join(base_cmd))
+    
+    # 按累计的命令行长度分批，每个路径额外计入分隔空格和可能的引号
+    batches = []
+    batch, batch_len = [], base_len
+    for path in paths:
+        path_len = len(path) + 3
+        if batch and batch_len + path_len > RM_CMDLINE_LIMIT:
+            batches.append(batch)
+            batch, batch_len = [], base_len
+        batch.append(path)
+        batch_len += path_len
+    if batch:
+        batches.append(batch)
+    
+    for batch in batches:
+        cmd = base_cmd + batch
+        try:
+            subprocess.run(cmd, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            print(f"调用系统删除命令失败: {e}")
+        
+        # 系统命令未能删除的目录使用 Python 方式删除
+        for path in batch:
+            if os.path.isdir(path):
+                _fast_rmtree(path)
+
+def _read_stamp(stamp_path):
+    """
+    读取缓存摘要文件
+    
+    参数:
+        stamp_path: 摘要文件路径
+        
+    返回:
+        str: 摘要字符串，文件不存在时返回None
+    """
+    if not os.path.exists(stamp_path):
+        return None
+    with open(stamp_path, 'r', encoding='utf-8') as f:
+        return f.read().strip()
+
+def _write_stamp(stamp_path, digest):
+    """
+    写入缓存摘要文件
+    
+    参数:
+        stamp_path: 摘要文件路径
+        digest: 摘要字符串
+    """
+    os.makedirs(BUILD_CACHE_DIR, exist_ok=True)
+    with open(stamp_path, 'w', encoding='utf-8') as f:
+        f.write(digest)
+
+def clean_build_directories(full=False):
     """
     清理构建目录
+    默认保留 PyInstaller 工作目录（含 spec 文件），使 PyInstaller 可以复用上次的分析结果
+    
+    参数:
+        full: 是否完全清理（同时删除 PyInstaller 工作目录和构建摘要）
     """
     print("清理构建目录...")
-    dirs_to_clean = ['build', 'dist', '__pycache__']
-    for dir_name in dirs_to_clean:
-        if os.path.exists(dir_name):
-            shutil.rmtree(dir_name)
+    # 早期版本的中间文件目录和项目根目录下的 spec 文件总是删除，避免被误用
+    dirs_to_clean = [LEGACY_BUILD_DIR, 'dist', NUITKA_OUTPUT_DIR, '__pycache__']
+    if full:
+        dirs_to_clean.append(WORK_DIR)
+        if os.path.exists(BUILD_INPUTS_STAMP):
+            os.remove(BUILD_INPUTS_STAMP)
+    _fast_rm([dir_name for dir_name in dirs_to_clean if os.path.isdir(dir_name)])
     
-    # 清理所有 .spec 文件
+    # 清理项目根目录下早期版本生成的 .spec 文件（当前的 spec 文件位于 WORK_DIR 中）
     for file in os.listdir('.'):
-        if file.endswith('.spec'):
+        if file.endswith('.spec') and os.path.isfile(file):
             os.remove(file)
             print(f"已删除: {file}")
     
     # 清理 Python 缓存文件
+    # 先收集所有缓存目录（不进入待删除的目录），再按路径由深到浅批量删除
+    cache_dirs = []
     for root, dirs, files in os.walk('.'):
-        for dir_name in dirs:
-            if dir_name == '__pycache__':
-                cache_dir = os.path.join(root, dir_name)
-                shutil.rmtree(cache_dir)
-                print(f"已删除: {cache_dir}")
+        cache_dirs.extend(os.path.join(root, d) for d in dirs if d == '__pycache__')
+        dirs[:] = [d for d in dirs if d != '__pycache__']
+    cache_dirs.sort(key=len, reverse=True)
+    _fast_rm(cache_dirs)
+    for cache_dir in cache_dirs:
+        print(f"已删除: {cache_dir}")
+
+def _requirements_digest():
+    """
+    计算依赖安装状态的摘要
+    由 requirements.txt 内容、Python 版本和解释器路径共同决定
+    
+    返回:
+        str: 十六进制摘要字符串
+    """
+    digest = hashlib.sha256()
+    if os.path.exists('requirements.txt'):
+        with open('requirements.txt', 'rb') as f:
+            digest.update(f.read())
+    digest.update(sys.version.encode('utf-8'))
+    digest.update(sys.executable.encode('utf-8'))
+    return digest.hexdigest()
 
 def install_requirements():
     """
     安装必要的依赖
+    如果依赖自上次安装后没有变化，则跳过 pip 调用
     """
     print("检查并安装必要的依赖...")
+    digest = _requirements_digest()
+    if _read_stamp(REQUIREMENTS_STAMP) == digest:
+        print("依赖未发生变化，跳过安装")
+        return
+    
+    pip_cmd = [sys.executable, '-m', 'pip', 'install', '--disable-pip-version-check', '--no-input', 'pyinstaller']
     try:
-        # 检查是否安装了 PyInstaller
-        subprocess.run([sys.executable, '-m', 'pip', 'install', 'pyinstaller'], check=True)
-        
-        # 安装项目依赖
+        # 一次调用同时安装 PyInstaller 和项目依赖，只需解析一次依赖关系
         if os.path.exists('requirements.txt'):
-            subprocess.run([sys.executable, '-m', 'pip', 'install', '-r', 'requirements.txt'], check=True)
+            subprocess.run(pip_cmd + ['-r', 'requirements.txt'], check=True)
             print("已安装 requirements.txt 中的所有依赖")
         else:
             print("警告: 未找到 requirements.txt 文件，安装基本依赖")
             # 安装基本依赖
-            subprocess.run([sys.executable, '-m', 'pip', 'install', 'PyQt5', 'python-docx', 'keyboard', 'Pillow'], check=True)
+            subprocess.run(pip_cmd + ['PyQt5', 'python-docx', 'keyboard', 'Pillow', 'mss'], check=True)
     except subprocess.CalledProcessError as e:
         print(f"安装依赖时出错: {e}")
         sys.exit(1)
+    
+    # 安装成功后记录摘要
+    _write_stamp(REQUIREMENTS_STAMP, digest)
 
 def create_icon():
     """
     创建应用程序图标
     """
     print("检查应用程序图标...")
-    icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'icon.ico')
+    icon_path = os.path.join(_HERE, 'icon.ico')
     
     # 如果图标已存在，直接返回路径
     if os.path.exists(icon_path):
@@ -81,12 +230,12 @@ def create_icon():
         return icon_path
     
     # 尝试使用create_icon.py脚本创建图标
-    create_icon_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'create_icon.py')
+    create_icon_script = os.path.join(_HERE, 'create_icon.py')
     if os.path.exists(create_icon_script):
         print("使用create_icon.py脚本创建图标...")
         try:
             # 导入并执行create_icon函数
-            sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+            sys.path.insert(0, _HERE)
             from create_icon import create_icon as generate_icon
             icon_path = generate_icon()
             return icon_path
@@ -99,6 +248,7 @@ def create_icon():
 def create_version_file():
     """
     创建版本信息文件
+    内容没有变化时不重写文件，保持其修改时间不变
     """
     version_info = f"""
 # UTF-8
@@ -109,8 +259,8 @@ VSVersionInfo(
   ffi=FixedFileInfo(
     # filevers and prodvers should be always a tuple with four items: (1, 2, 3, 4)
     # Set not needed items to zero 0.
-    filevers=(1, 0, 4, 0),
-    prodvers=(1, 0, 4, 0),
+    filevers={_VERSION_TUPLE},
+    prodvers={_VERSION_TUPLE},
     # Contains a bitmask that specifies the valid bits 'flags'r
     mask=0x3f,
     # Contains a bitmask that specifies the Boolean attributes of the file.
@@ -134,30 +284,84 @@ VSVersionInfo(
         u'080404b0',
         [StringStruct(u'CompanyName', u''),
         StringStruct(u'FileDescription', u'屏幕截图工具'),
-        StringStruct(u'FileVersion', u'1.0.4'),
+        StringStruct(u'FileVersion', u'{APP_VERSION}'),
         StringStruct(u'InternalName', u'ScreenshotTool'),
-        StringStruct(u'LegalCopyright', u'Copyright (C) {datetime.now().year}'),
+        StringStruct(u'LegalCopyright', u'Copyright (C) {_BUILD_YEAR}'),
         StringStruct(u'OriginalFilename', u'ScreenshotTool.exe'),
         StringStruct(u'ProductName', u'屏幕截图工具'),
-        StringStruct(u'ProductVersion', u'1.0.4')])
+        StringStruct(u'ProductVersion', u'{APP_VERSION}')])
       ]), 
     VarFileInfo([VarStruct(u'Translation', [2052, 1200])])
   ]
 )
 """
-    version_file = "version_info.txt"
+    version_file = VERSION_FILE
+    if os.path.exists(version_file):
+        with open(version_file, "r", encoding="utf-8") as f:
+            if f.read() == version_info:
+                return version_file
     with open(version_file, "w", encoding="utf-8") as f:
         f.write(version_info)
     return version_file
 
-def build_executable():
+def _build_inputs_digest(params, input_files):
+    """
+    计算构建输入的摘要
+    由 PyInstaller 参数、源代码目录和其他输入文件的内容共同决定
+    
+    参数:
+        params: PyInstaller 命令行参数列表
+        input_files: 其他参与构建的文件路径列表
+        
+    返回:
+        str: 十六进制摘要字符串
+    """
+    digest = hashlib.sha256()
+    digest.update("\0".join(params).encode('utf-8'))
+    
+    paths = [path for path in input_files if os.path.exists(path)]
+    for root, dirs, files in os.walk(SOURCE_DIR):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        paths.extend(os.path.join(root, name) for name in sorted(files) if name.endswith('.py'))
+    
+    for path in paths:
+        digest.update(path.encode('utf-8'))
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def get_executable_path(current_dir, pack_mode, engine="pyinstaller"):
+    """
+    获取构建产物中可执行文件的路径
+    
+    参数:
+        current_dir: 项目根目录
+        pack_mode: 打包模式，onedir 或 onefile
+        engine: 构建工具，pyinstaller 或 nuitka
+    """
+    if engine == "nuitka":
+        if pack_mode == "onefile":
+            return os.path.join(current_dir, NUITKA_OUTPUT_DIR, APP_NAME + '.exe')
+        # Nuitka standalone 模式的输出目录以入口脚本命名
+        dist_dir = os.path.splitext(MAIN_SCRIPT)[0] + '.dist'
+        return os.path.join(current_dir, NUITKA_OUTPUT_DIR, dist_dir, APP_NAME + '.exe')
+    if pack_mode == "onefile":
+        return os.path.join(current_dir, OUTPUT_DIR, APP_NAME + '.exe')
+    return os.path.join(current_dir, OUTPUT_DIR, APP_NAME, APP_NAME + '.exe')
+
+def build_executable(pack_mode="onedir", compress=False, icon_path=None):
     """
     构建可执行文件
+    
+    参数:
+        pack_mode: 打包模式，onedir（默认，启动快）或 onefile（单文件，每次启动需解压）
+        compress: 是否使用 UPX 压缩（Qt 和 Python 核心 DLL 除外）
+        icon_path: 图标文件路径，为None时使用默认图标
     """
     print("开始构建可执行文件...")
     
     # 获取当前目录
-    current_dir = os.path.dirname(os.path.abspath(__file__))
+    current_dir = _HERE
     
     # 创建临时目录用于存放额外文件
     temp_dir = os.path.join(current_dir, 'temp_build')
@@ -166,37 +370,52 @@ def build_executable():
     # 创建版本信息文件
     version_file = create_version_file()
     
-    # 创建或获取图标文件
-    icon_path = create_icon()
-    
     # 收集额外的数据文件
     datas = []
     if os.path.exists('README.md'):
-        datas.append(('README.md', '.'))
+        datas.append((os.path.join(current_dir, 'README.md'), '.'))
+    
+    # 输出目录和中间文件目录，复用 spec 文件时同样需要指定，否则 PyInstaller 会使用默认的 ./build
+    path_params = [
+        f'--distpath={OUTPUT_DIR}',  # 输出目录
+        f'--workpath={WORK_DIR}',  # 中间文件目录（含分析缓存）
+    ]
     
     # 定义 PyInstaller 参数
     params = [
-        MAIN_SCRIPT,  # 主程序入口文件
+        os.path.join(current_dir, MAIN_SCRIPT),  # 主程序入口文件
         f'--name={APP_NAME}',  # 生成的 EXE 文件名
-        '--onefile',  # 生成单个 EXE 文件
+        f'--{pack_mode}',  # onedir 避免每次启动解压到临时目录
         '--windowed',  # 使用窗口模式，不显示控制台
-        '--clean',  # 清理临时文件
         '--noconfirm',  # 不询问确认
-        f'--version-file={version_file}',  # 版本信息文件
+        f'--version-file={os.path.join(current_dir, version_file)}',  # 版本信息文件
+        *path_params,
+        f'--specpath={WORK_DIR}',  # spec 文件目录（spec 中的相对路径以该目录为基准，因此上面均使用绝对路径）
     ]
     
+    # UPX 压缩可减小体积，但压缩后的程序可能被杀毒软件误报，因此默认关闭
+    if compress and os.path.isdir(UPX_DIR):
+        os.environ['UPX'] = '--best'  # UPX 从该环境变量读取默认参数
+        params.append(f'--upx-dir={UPX_DIR}')
+        params.extend(f'--upx-exclude={dll}' for dll in UPX_EXCLUDES)
+    else:
+        if compress:
+            print(f"警告: 未找到 UPX 目录 {UPX_DIR}，将不使用 UPX 压缩")
+        params.append('--noupx')  # 不使用 UPX，避免启动时额外的解压开销
+    
     # 添加数据文件
     for src, dst in datas:
         params.append(f'--add-data={src};{dst}')
     
     # 如果有图标文件，添加图标参数
     if icon_path:
-        params.append(f'--icon={icon_path}')
+        params.append(f'--icon={os.path.abspath(icon_path)}')
     
     # 添加隐藏导入
     hidden_imports = [
         '--hidden-import=docx',
         '--hidden-import=keyboard',
+        '--hidden-import=mss',
         '--hidden-import=PyQt5',
         '--hidden-import=PyQt5.QtWidgets',
         '--hidden-import=PyQt5.QtCore',
@@ -209,14 +428,48 @@ def build_executable():
     ]
     params.extend(hidden_imports)
     
+    # 排除未使用的 PyQt5 子模块和标准库模块，减小打包体积和首次启动的读取量
+    excluded_modules = [
+        '--exclude-module=PyQt5.QtNetwork',
+        '--exclude-module=PyQt5.QtWebEngine',
+        '--exclude-module=PyQt5.QtWebEngineCore',
+        '--exclude-module=PyQt5.QtWebEngineWidgets',
+        '--exclude-module=PyQt5.QtQml',
+        '--exclude-module=PyQt5.QtQuick',
+        '--exclude-module=PyQt5.QtQuickWidgets',
+        '--exclude-module=PyQt5.QtMultimedia',
+        '--exclude-module=PyQt5.QtMultimediaWidgets',
+        '--exclude-module=PyQt5.QtSql',
+        '--exclude-module=PyQt5.QtBluetooth',
+        '--exclude-module=PyQt5.QtTest',
+        '--exclude-module=PyQt5.QtOpenGL',
+        '--exclude-module=PyQt5.QtDesigner',
+        '--exclude-module=PyQt5.QtHelp',
+        '--exclude-module=PyQt5.QtXml',
+        '--exclude-module=tkinter',
+        '--exclude-module=unittest',
+        '--exclude-module=pydoc_data',
+        '--exclude-module=distutils',
+    ]
+    params.extend(excluded_modules)
+    
+    # 构建输入未变化时直接使用已有的 spec 文件，PyInstaller 会复用 WORK_DIR 中的分析缓存
+    digest = _build_inputs_digest(params, [MAIN_SCRIPT, 'requirements.txt', version_file])
+    if os.path.exists(SPEC_FILE) and _read_stamp(BUILD_INPUTS_STAMP) == digest:
+        print(f"构建输入未变化，复用 {SPEC_FILE}")
+        pyinstaller_args = [SPEC_FILE, '--noconfirm'] + path_params
+    else:
+        pyinstaller_args = params
+    
     # 运行 PyInstaller
     try:
-        PyInstaller.__main__.run(params)
+        PyInstaller.__main__.run(pyinstaller_args)
+        _write_stamp(BUILD_INPUTS_STAMP, digest)
         print("构建完成！")
-        print(f"可执行文件位于: {os.path.join(current_dir, OUTPUT_DIR, APP_NAME + '.exe')}")
+        print(f"可执行文件位于: {get_executable_path(current_dir, pack_mode)}")
         
         # 创建发布包
-        create_release_package()
+        create_release_package(pack_mode)
     except Exception as e:
         print(f"构建过程中出错: {e}")
         sys.exit(1)
@@ -224,28 +477,96 @@ def build_executable():
         # 清理临时文件
         if os.path.exists(temp_dir):
             shutil.rmtree(temp_dir)
-        if os.path.exists(version_file):
-            os.remove(version_file)
 
-def create_release_package():
+def build_nuitka(pack_mode="onedir", icon_path=None):
+    """
+    使用 Nuitka 将程序编译为可执行文件
+    编译后的程序无需在启动时加载解释器字节码，冷启动更快
+    
+    参数:
+        pack_mode: 打包模式，onedir（standalone 目录）或 onefile（单文件）
+        icon_path: 图标文件路径，为None时使用默认图标
+    """
+    print("开始使用 Nuitka 构建可执行文件...")
+    current_dir = _HERE
+    
+    # 按需安装 Nuitka
+    if importlib.util.find_spec('nuitka') is None:
+        try:
+            subprocess.run([sys.executable, '-m', 'pip', 'install', '--disable-pip-version-check',
+                            '--no-input', 'nuitka'], check=True)
+        except subprocess.CalledProcessError as e:
+            print(f"安装 Nuitka 时出错: {e}")
+            sys.exit(1)
+    
+    # 定义 Nuitka 参数
+    params = [
+        sys.executable, '-m', 'nuitka',
+        '--standalone',  # 生成包含所有依赖的独立目录
+        '--windows-console-mode=disable',  # 使用窗口模式，不显示控制台
+        '--enable-plugin=pyqt5',
+        '--include-package=docx',
+        '--assume-yes-for-downloads',
+        f'--output-dir={NUITKA_OUTPUT_DIR}',
+        f'--output-filename={APP_NAME}.exe',
+        f'--product-name={APP_NAME}',
+        f'--product-version={APP_VERSION}',
+        f'--file-version={APP_VERSION}',
+    ]
+    
+    # 单文件模式下解压到固定的缓存目录，同一版本只需解压一次
+    if pack_mode == "onefile":
+        params.append('--onefile')
+        params.append(f'--onefile-tempdir-spec={{CACHE_DIR}}/{APP_NAME}/{APP_VERSION}')
+    
+    # 如果有图标文件，添加图标参数
+    if icon_path:
+        params.append(f'--windows-icon-from-ico={os.path.abspath(icon_path)}')
+    
+    params.append(MAIN_SCRIPT)
+    
+    # 运行 Nuitka
+    try:
+        subprocess.run(params, check=True)
+        print("构建完成！")
+        print(f"可执行文件位于: {get_executable_path(current_dir, pack_mode, engine='nuitka')}")
+        
+        # 创建发布包
+        create_release_package(pack_mode, engine='nuitka')
+    except subprocess.CalledProcessError as e:
+        print(f"构建过程中出错: {e}")
+        sys.exit(1)
+
+def create_release_package(pack_mode="onedir", engine="pyinstaller"):
     """
     创建发布包
+    
+    参数:
+        pack_mode: 打包模式，onedir 时复制整个程序目录，onefile 时只复制单个 EXE
+        engine: 构建工具，pyinstaller 或 nuitka
     """
     try:
         print("创建发布包...")
         
         # 获取当前目录
-        current_dir = os.path.dirname(os.path.abspath(__file__))
+        current_dir = _HERE
         
         # 创建发布目录
         release_dir = os.path.join(current_dir, 'release')
         os.makedirs(release_dir, exist_ok=True)
         
         # 复制可执行文件
-        exe_file = os.path.join(current_dir, OUTPUT_DIR, APP_NAME + '.exe')
+        exe_file = get_executable_path(current_dir, pack_mode, engine)
         if os.path.exists(exe_file):
-            release_file = os.path.join(release_dir, APP_NAME + '.exe')
-            shutil.copy2(exe_file, release_file)
+            if pack_mode == "onefile":
+                release_file = os.path.join(release_dir, APP_NAME + '.exe')
+                shutil.copy2(exe_file, release_file)
+            else:
+                # onedir 模式下复制整个程序目录
+                release_app_dir = os.path.join(release_dir, APP_NAME)
+                if os.path.exists(release_app_dir):
+                    shutil.rmtree(release_app_dir)
+                shutil.copytree(os.path.dirname(exe_file), release_app_dir)
             
             # 复制 README 文件
             if os.path.exists('README.md'):
@@ -257,21 +578,45 @@ def create_release_package():
     except Exception as e:
         print(f"创建发布包时出错: {e}")
 
+def parse_args():
+    """
+    解析命令行参数
+    """
+    parser = argparse.ArgumentParser(description=f"构建 {APP_NAME} 可执行文件")
+    parser.add_argument('--pack', choices=PACK_MODES, default="onedir",
+                        help="打包模式: onedir（默认，启动快）或 onefile（单文件）")
+    parser.add_argument('--engine', choices=BUILD_ENGINES, default="pyinstaller",
+                        help="构建工具: pyinstaller（默认）或 nuitka（编译为C，冷启动更快）")
+    parser.add_argument('--clean', action='store_true',
+                        help="完全清理后重新构建，不复用 spec 文件和分析缓存")
+    parser.add_argument('--compress', action='store_true',
+                        help=f"使用 {UPX_DIR} 中的 UPX 压缩程序文件（Qt 和 Python 核心 DLL 除外，仅 PyInstaller）")
+    return parser.parse_args()
+
 def main():
     """
     主函数
     """
+    args = parse_args()
+    
     print(f"=== 开始构建 {APP_NAME} v{APP_VERSION} ===")
     print(f"时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
     # 清理旧的构建文件
-    clean_build_directories()
+    clean_build_directories(full=args.clean)
     
     # 安装必要的依赖
     install_requirements()
     
+    # 生成图标需要 Pillow，而 pip 可能正在安装或升级 Pillow，因此不与依赖安装并行，
+    # 必须在依赖安装完成后执行；图标已存在时直接返回，串行执行也没有额外耗时
+    icon_path = create_icon()
+    
     # 构建可执行文件
-    build_executable()
+    if args.engine == "nuitka":
+        build_nuitka(args.pack, icon_path=icon_path)
+    else:
+        build_executable(args.pack, compress=args.compress, icon_path=icon_path)
     
     print(f"=== {APP_NAME} v{APP_VERSION} 构建完成 ===")
 
@@ -12,6 +12,12 @@ def create_icon():
     """
     print("创建应用程序图标...")
     
+    # 如果图标比本脚本新，说明已是最新，无需重新生成
+    ico_path = "icon.ico"
+    if os.path.exists(ico_path) and os.path.getmtime(ico_path) > os.path.getmtime(__file__):
+        print(f"ICO图标已是最新: {ico_path}")
+        return ico_path
+    
     # 创建一个512x512的透明背景图像
     icon_size = 512
     icon = Image.new('RGBA', (icon_size, icon_size), (0, 0, 0, 0))
@@ -86,19 +92,12 @@ def create_icon():
     
     # 保存为ICO
     try:
-        ico_path = "icon.ico"
-        # 创建不同尺寸的图标
+        # 创建不同尺寸的图标，由ICO编码器从原图直接缩放生成
         sizes = [16, 32, 48, 64, 128, 256]
-        icons = []
-        for size in sizes:
-            icons.append(icon.resize((size, size), Image.LANCZOS))
-        
-        # 保存为ICO文件
-        icons[0].save(
+        icon.save(
             ico_path,
             format='ICO',
-            sizes=[(i.width, i.height) for i in icons],
-            append_images=icons[1:]
+            sizes=[(size, size) for size in sizes]
         )
         print(f"ICO图标已保存: {ico_path}")
         return ico_path
@@ -5,12 +5,25 @@
 
 import sys
 import os
+import argparse
 
 # 确保当前目录在Python路径中
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
-# 导入主程序入口
-from src.main import main
+def parse_args():
+    """
+    解析命令行参数
+    只处理本脚本自身的参数，其余参数（如Qt参数）原样保留
+    """
+    from src import __version__
+    parser = argparse.ArgumentParser(description="屏幕截图工具")
+    parser.add_argument('--version', action='version', version=f"%(prog)s {__version__}")
+    return parser.parse_known_args()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    # 先解析参数，--help/--version 无需加载PyQt5等重量级模块
+    parse_args()
+
+    # 导入主程序入口
+    from src.main import main
+    main()
@@ -3,5 +3,5 @@
 用于快速截取屏幕并保存到Word文档中
 """
 
-__version__ = '1.0.0'
+__version__ = '1.0.4'  # 版本号的唯一来源，构建脚本、关于对话框和--version均读取此处
 __author__ = 'Wei' 
\ No newline at end of file
@@ -3,17 +3,361 @@
 用于处理Word文档的创建、打开、保存等操作
 """
 
+import gc
+import io
 import os
-import copy
+import json
+import hashlib
+import logging
+import stat
+import sys
+import time
 import traceback
 import datetime
-from docx import Document
-from docx.shared import Inches
-from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from copy import deepcopy
+from itertools import islice
+import zipfile
+import tempfile
+import xml.etree.ElementTree as ET
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5.QtWidgets import QFileDialog, QMessageBox
+from PyQt5.QtCore import Qt, QTimer, QBuffer, QByteArray, QIODevice
 from src.utils.logger import logger
 import shutil
 
+# 自动保存配置
+AUTOSAVE_DELAY = 2          # 最后一次截图后等待多久再保存（秒），期间的新截图会重新计时
+AUTOSAVE_MAX_PENDING = 10   # 未保存的截图达到该数量时立即保存
+
+# .bak滚动备份的最短间隔（秒），设为0则不创建备份
+# os.replace本身是原子操作，备份只用于找回之前的版本，无需每次保存都创建
+BACKUP_INTERVAL = 300
+
+# 截图PNG编码质量：Qt对PNG将质量映射为压缩级别（0为最高压缩，100为不压缩）
+# 默认的最高压缩非常耗时，80约对应zlib压缩级别1~2，文件略大但编码快数倍
+SCREENSHOT_PNG_QUALITY = 80
+
+# 截图在文档中的显示宽度（英寸）及嵌入分辨率
+# 超过 宽度×DPI 像素的截图会先缩小再嵌入，避免全分辨率图片撑大文档
+IMAGE_WIDTH_INCHES = 6
+IMAGE_TARGET_DPI = 150
+
+# 截图日志：尚未写入文档的截图先追加到日志并把图片写入旁路目录，程序崩溃后打开文档时可恢复
+# 日志放在用户数据目录下，每个文档一个子目录（以文档路径的摘要命名），不在用户文档旁边留下文件
+JOURNAL_ROOT = os.path.join(
+    os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_DATA_HOME')
+    or os.path.join(os.path.expanduser('~'), '.local', 'share'),
+    'ScreenshotTool', 'journal'
+)
+JOURNAL_FILE = "journal.jsonl"
+JOURNAL_IMAGE_DIR = "images"
+
+# PNG编码缓冲区的预留容量（字节），缩小后的截图通常不超过该大小
+ENCODE_BUFFER_RESERVE = 2 * 1024 * 1024
+
+# 保存docx时XML部件的压缩级别（1最快），标准库默认为6
+DOCX_COMPRESS_LEVEL = 1
+# 已压缩过的图片格式，再次deflate几乎不能减小体积，直接存储
+_STORED_EXTS = frozenset(('png', 'jpg', 'jpeg', 'gif'))
+
+# 文档关系（relationships）的XML命名空间
+_R_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+
+# 进程的umask，用于给新建的文档设置默认权限（在导入时读取一次，避免在线程中修改umask）
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def _file_digest(path, chunk_size=1024 * 1024):
+    """
+    分块计算文件内容的摘要
+    只用于判断内容是否变化，使用比SHA-256更快的BLAKE2b（16字节摘要）
+    
+    参数:
+        path: 字符串，文件路径
+        chunk_size: 每次读取的字节数
+        
+    返回:
+        bytes: 文件内容的摘要
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb', buffering=chunk_size) as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+def _journal_dir(doc_path):
+    """
+    获取文档对应的截图日志目录
+    
+    参数:
+        doc_path: 字符串，文档路径
+        
+    返回:
+        str: 日志目录路径
+    """
+    key = os.path.normcase(os.path.abspath(doc_path)).encode('utf-8')
+    return os.path.join(JOURNAL_ROOT, hashlib.blake2b(key, digest_size=16).hexdigest())
+
+def _parse_journal(lines, doc_digest):
+    """
+    解析截图日志，找出尚未写入文档的截图记录
+    保存文档时会在替换文件前写入保存标记，记录此前已写入文档的截图数量和新文件的摘要；
+    只有当前文档的摘要与标记一致（替换已完成）时，标记之前的截图才视为已保存
+    
+    参数:
+        lines: 可迭代的日志行
+        doc_digest: bytes，当前文档内容的摘要，未知时为None
+        
+    返回:
+        list: 尚未写入文档的截图记录（字典）
+    """
+    entries = []
+    saved = 0
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError as e:
+            logger.warning(f"跳过无法解析的截图日志记录: {str(e)}")
+            continue
+        if 'saved' in entry:
+            if doc_digest is not None and entry.get('digest') == doc_digest.hex():
+                saved = entry['saved']
+        else:
+            entries.append(entry)
+    return entries[saved:]
+
+def _read_part_crcs(file):
+    """
+    从zip中央目录读取所有部件的CRC，无需解压任何内容
+    样式、页眉页脚、编号和图片等部件的修改同样会反映在结果中
+    
+    参数:
+        file: 文件路径或可读的二进制文件对象
+        
+    返回:
+        dict: 部件名 -> CRC，文件不是有效的docx时返回None
+    """
+    try:
+        with zipfile.ZipFile(file) as zf:
+            return {info.filename: info.CRC for info in zf.infolist()}
+    except (OSError, zipfile.BadZipFile):
+        return None
+
+def _check_writable(path):
+    """
+    用一次stat同时判断路径是否存在以及当前用户是否可写
+    
+    参数:
+        path: 字符串，文件或目录路径
+        
+    返回:
+        tuple: (os.stat_result或None, bool是否可写)，路径不存在时返回(None, False)
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None, False
+    
+    if os.name == 'nt':
+        # Windows只有只读属性，目录的该属性不影响在其中创建文件
+        writable = stat.S_ISDIR(st.st_mode) or bool(st.st_mode & stat.S_IWRITE)
+    else:
+        euid = os.geteuid()
+        if euid == 0:
+            writable = True
+        elif st.st_uid == euid:
+            writable = bool(st.st_mode & stat.S_IWUSR)
+        elif st.st_gid == os.getegid() or st.st_gid in os.getgroups():
+            writable = bool(st.st_mode & stat.S_IWGRP)
+        else:
+            writable = bool(st.st_mode & stat.S_IWOTH)
+    return st, writable
+
+def _probe_writable(dir_path):
+    """
+    通过实际创建并删除一个探测文件，判断目录是否可写
+    比os.access或权限位更准确，能正确处理Windows ACL和网络文件系统
+    
+    参数:
+        dir_path: 字符串，目录路径
+        
+    返回:
+        bool: 目录可写返回True，否则返回False
+    """
+    probe_path = os.path.join(dir_path, f".write_probe_{os.getpid()}")
+    try:
+        fd = os.open(probe_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.close(fd)
+        os.remove(probe_path)
+        return True
+    except OSError as e:
+        logger.debug("目录写入探测失败: %s", e)
+        return False
+
+def _has_relationship_refs(element):
+    """
+    判断XML元素中是否引用了文档关系（如图片的r:embed、超链接的r:id）
+    这类元素依赖所在文档的关系表，不能直接复制到其他文档
+    
+    参数:
+        element: lxml元素
+        
+    返回:
+        bool: 存在关系引用返回True
+    """
+    for el in element.iter():
+        for attr in el.attrib:
+            if attr.startswith(_R_NS):
+                return True
+    return False
+
+def _count_paragraphs(document):
+    """
+    统计正文中直接包含的段落数量，与len(document.paragraphs)一致
+    只做一次XPath计数，不为每个段落创建Paragraph对象
+    
+    参数:
+        document: docx.Document对象
+        
+    返回:
+        int: 段落数量
+    """
+    return int(document.element.body.xpath('count(w:p)'))
+
+class _FastZipPkgWriter:
+    """
+    python-docx物理包写入器的替代实现
+    XML部件使用低压缩级别，已压缩的图片直接存储，减少每次保存的CPU开销
+    """
+    
+    def __init__(self, pkg_file):
+        # compresslevel参数从Python 3.7起才支持，更早的版本使用默认压缩级别
+        kwargs = {'compresslevel': DOCX_COMPRESS_LEVEL} if sys.version_info >= (3, 7) else {}
+        self._zipf = zipfile.ZipFile(pkg_file, 'w', compression=zipfile.ZIP_DEFLATED, **kwargs)
+    
+    def write(self, pack_uri, blob):
+        """
+        将部件写入压缩包
+        
+        参数:
+            pack_uri: docx.opc.packuri.PackURI，部件路径
+            blob: 字节串，部件内容
+        """
+        if pack_uri.ext.lower() in _STORED_EXTS:
+            self._zipf.writestr(pack_uri.membername, blob, compress_type=zipfile.ZIP_STORED)
+        else:
+            self._zipf.writestr(pack_uri.membername, blob)
+    
+    def close(self):
+        """关闭压缩包，写入中央目录"""
+        self._zipf.close()
+
+def _save_package(document, stream):
+    """
+    使用_FastZipPkgWriter保存文档，流程与OpcPackage.save一致
+    依赖python-docx的内部接口，接口不可用或写入出错时清空已写入的内容并退回document.save
+    
+    参数:
+        document: docx.Document对象
+        stream: 可写、可定位的文件对象
+    """
+    start = stream.tell()
+    try:
+        from docx.opc.pkgwriter import PackageWriter
+        write_content_types = PackageWriter._write_content_types_stream
+        write_pkg_rels = PackageWriter._write_pkg_rels
+        write_parts = PackageWriter._write_parts
+        
+        package = document.part.package
+        parts = list(package.parts)
+        for part in parts:
+            part.before_marshal()
+        
+        writer = _FastZipPkgWriter(stream)
+        try:
+            write_content_types(writer, parts)
+            write_pkg_rels(writer, package.rels)
+            write_parts(writer, parts)
+        finally:
+            writer.close()
+    except Exception as e:
+        # python-docx内部接口的签名或行为变化时，丢弃写了一半的内容，用公开接口重新保存
+        logger.warning(f"快速保存文档失败，改用document.save: {str(e)}")
+        stream.seek(start)
+        stream.truncate()
+        document.save(stream)
+
+class _LazyDocument:
+    """
+    延迟解析的磁盘文档
+    只流式扫描word/document.xml统计段落数量，真正需要文档内容时才用python-docx完整解析
+    """
+    
+    _W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+    
+    def __init__(self, path):
+        """
+        初始化延迟文档
+        
+        参数:
+            path: 字符串，docx文件路径
+        """
+        self.path = path
+        self._paragraph_count = None
+        self._document = None
+    
+    @property
+    def paragraph_count(self):
+        """
+        正文中的段落数量，与python-docx的document.paragraphs数量一致
+        """
+        if self._paragraph_count is None:
+            try:
+                self._paragraph_count = self._scan_paragraph_count()
+            except (KeyError, zipfile.BadZipFile, ET.ParseError) as e:
+                # 非标准结构的文档退回到完整解析
+                logger.debug("流式统计段落失败，改为完整解析: %s", e)
+                self._paragraph_count = _count_paragraphs(self.materialize())
+        return self._paragraph_count
+    
+    def _scan_paragraph_count(self):
+        """
+        流式解析word/document.xml，统计w:body下直接包含的w:p元素
+        """
+        body_tag = self._W_NS + 'body'
+        p_tag = self._W_NS + 'p'
+        count = 0
+        depth = 0
+        body_depth = None
+        
+        with zipfile.ZipFile(self.path) as zf:
+            with zf.open('word/document.xml') as f:
+                for event, elem in ET.iterparse(f, events=('start', 'end')):
+                    if event == 'start':
+                        depth += 1
+                        if elem.tag == body_tag:
+                            body_depth = depth
+                        elif elem.tag == p_tag and body_depth is not None and depth == body_depth + 1:
+                            count += 1
+                    else:
+                        depth -= 1
+                        # 及时释放已处理的元素，内存占用与文档大小无关
+                        elem.clear()
+        return count
+    
+    def materialize(self):
+        """
+        用python-docx完整解析文档
+        
+        返回:
+            docx.Document: 解析后的文档对象
+        """
+        if self._document is None:
+            from docx import Document
+            self._document = Document(self.path)
+        return self._document
+
 class DocumentManager:
     """
     文档管理器类
@@ -30,10 +374,46 @@ class DocumentManager:
         self.parent = parent
         self.word_doc = None
         self.word_path = None
-        self.original_paragraphs = []  # 保存打开文档时的原始段落数量
+        self.original_paragraph_count = 0  # 打开或上次保存时的段落数量
         self.original_rels_count = 0   # 保存打开文档时的原始关系数量（用于图片计数）
-        self.current_image_path = None  # 当前要添加的图片路径
-        self.current_text_description = None  # 当前要添加的文本说明
+        self.original_rel_ids = frozenset()  # 打开或上次保存时的关系ID，合并时用于找出新增关系
+        self._insert_point = (None, None)  # 缓存的(正文元素, sectPr元素)，新段落插入在sectPr之前
+        self.last_modified_time = None  # 打开或上次保存时文件的修改时间（纳秒整数，比较时不受浮点精度影响）
+        self.last_digest = None  # 打开或上次保存时文件内容的BLAKE2b摘要，用于确认外部修改
+        self.last_part_crcs = None  # 打开或上次保存时各部件的CRC，用于快速确认外部修改
+        self._extmeta_cache = {}  # 外部修改后的文件 (st_mtime_ns, 大小) -> 段落数量，避免重复扫描
+        self._pending = []  # 尚未保存的截图 (说明文字, PNG数据)，保存时才插入文档
+        self._applied_count = 0  # _pending中已插入word_doc但尚未成功保存的数量
+        self._doc_valid = False  # 文档创建或打开成功后为True，写入文档内容失败时置为False
+        self._autosave_paused = False  # 用户取消保存后，定时器不再反复弹出合并对话框
+        self._saving = False  # 是否正在保存，防止保存对话框期间重复触发保存
+        self._last_backup_ts = None  # 上次创建备份的时间（time.monotonic）
+        
+        # 文件写入在单线程后台执行，保证保存按顺序进行且不阻塞界面
+        # 对话框等界面操作仍在主线程，开始新的保存前会等待上一次写入完成
+        self._save_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="DocumentSave")
+        self._save_future = None
+        self._doc_lock = threading.Lock()  # 保护后台写入期间的word_doc
+        
+        # 截图日志文件，add_screenshot与后台写入线程通过锁互斥访问日志和_pending
+        self._journal = None
+        self._journal_lock = threading.Lock()
+        
+        # 复用的文件对话框，首次使用时创建
+        self._file_dialog = None
+        
+        # 截图的缩放和PNG编码在单线程后台执行，按截图顺序加入_pending，不阻塞界面
+        self._encode_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ScreenshotEncode")
+        self._encode_futures = []  # 尚未确认结果的编码任务，保存前全部等待完成
+        
+        # 复用的PNG编码缓冲区（只在编码线程中使用），预留容量后QBuffer清空时不会释放内存
+        self._encode_buf = QByteArray()
+        self._encode_buf.reserve(ENCODE_BUFFER_RESERVE)
+        
+        # 防抖保存：每次截图后重新计时，连续截图停止后才保存一次
+        self._autosave_timer = QTimer(parent)
+        self._autosave_timer.setSingleShot(True)
+        self._autosave_timer.timeout.connect(self._on_autosave_timer)
         logger.debug("初始化文档管理器")
     
     def create_document(self):
@@ -43,6 +423,15 @@ class DocumentManager:
         返回:
             bool: 创建成功返回True，否则返回False
         """
+        # 先保存当前文档中尚未保存的截图
+        self.flush_pending()
+        
+        # 关闭旧文档的截图日志，保存失败的截图留在日志中，下次打开旧文档时恢复
+        self._switch_journal()
+        
+        # python-docx依赖lxml，导入较慢，只在真正需要文档时才导入
+        from docx import Document
+        
         try:
             # 创建新的Word文档
             logger.debug("尝试创建新的Word文档")
@@ -56,9 +445,7 @@ class DocumentManager:
             self.word_doc.add_paragraph(f'创建时间: {current_time}')
             
             # 询问保存位置
-            file_path, _ = QFileDialog.getSaveFileName(
-                self.parent, '保存Word文档', '', 'Word Documents (*.docx)'
-            )
+            file_path = self._ask_file_path('保存Word文档', QFileDialog.AcceptSave)
             
             if not file_path:
                 logger.debug("用户取消了保存文档")
@@ -71,21 +458,22 @@ class DocumentManager:
             
             # 检查目录是否存在
             dir_path = os.path.dirname(file_path)
-            if not os.path.exists(dir_path):
+            if not os.path.isdir(dir_path):
                 logger.error(f"保存目录不存在: {dir_path}")
                 QMessageBox.critical(self.parent, '错误', f'保存目录不存在: {dir_path}')
                 self.word_doc = None
                 return False
                 
-            # 检查目录是否可写
-            if not os.access(dir_path, os.W_OK):
+            # 检查目录是否可写（实际写入探测文件）
+            if not _probe_writable(dir_path):
                 logger.error(f"保存目录无法写入: {dir_path}")
                 QMessageBox.critical(self.parent, '错误', f'保存目录无法写入: {dir_path}')
                 self.word_doc = None
                 return False
                 
             # 如果文件已存在，检查是否可写
-            if os.path.exists(file_path) and not os.access(file_path, os.W_OK):
+            file_stat, file_writable = _check_writable(file_path)
+            if file_stat is not None and not file_writable:
                 logger.error(f"文件无法写入: {file_path}")
                 QMessageBox.critical(self.parent, '错误', f'文件无法写入: {file_path}')
                 self.word_doc = None
@@ -93,50 +481,31 @@ class DocumentManager:
             
             # 保存文档
             try:
-                logger.debug(f"尝试保存文档: {file_path}")
-                
-                # 创建临时文件名
-                temp_path = file_path + ".tmp"
-                
-                # 先保存到临时文件
-                self.word_doc.save(temp_path)
-                
-                # 如果原文件存在，先备份
-                if os.path.exists(file_path):
-                    backup_path = file_path + ".bak"
-                    try:
-                        if os.path.exists(backup_path):
-                            os.remove(backup_path)
-                        os.rename(file_path, backup_path)
-                        logger.debug(f"已创建备份文件: {backup_path}")
-                    except Exception as e:
-                        logger.warning(f"创建备份文件时出错: {str(e)}")
+                logger.debug("尝试保存文档: %s", file_path)
                 
-                # 将临时文件重命名为目标文件
-                os.rename(temp_path, file_path)
+                saved_stat, digest = self._atomic_save(file_path)
                 
                 self.word_path = file_path
                 
                 # 记录文件的最后修改时间
-                self.last_modified_time = os.path.getmtime(file_path)
-                logger.debug(f"记录文件最后修改时间: {self.last_modified_time}")
+                self.last_modified_time = saved_stat.st_mtime_ns
+                self.last_digest = digest
+                self.last_part_crcs = _read_part_crcs(file_path)
+                logger.debug("记录文件最后修改时间: %s", self.last_modified_time)
                 
                 # 保存原始文档内容的信息
                 self.save_original_content_info()
+                self._doc_valid = True
                 
-                logger.info(f"文档已成功创建并保存: {file_path}")
+                # 新文档覆盖了同名文件，旧的截图日志已无意义
+                self._discard_journal()
+                self._open_journal()
+                
+                logger.info("文档已成功创建并保存: %s", file_path)
                 return True
                 
             except Exception as e:
-                logger.error(f"保存文档时出错: {str(e)}")
-                logger.error(traceback.format_exc())
-                
-                # 检查临时文件是否存在，如果存在则删除
-                if os.path.exists(temp_path):
-                    try:
-                        os.remove(temp_path)
-                    except:
-                        pass
+                logger.error(f"保存文档时出错: {str(e)}", exc_info=True)
                 
                 # 显示错误消息
                 QMessageBox.critical(self.parent, '错误', f'保存Word文档时出错: {str(e)}')
@@ -145,8 +514,7 @@ class DocumentManager:
                 return False
                 
         except Exception as e:
-            logger.error(f"创建Word文档时出错: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.error(f"创建Word文档时出错: {str(e)}", exc_info=True)
             QMessageBox.critical(self.parent, '错误', f'创建Word文档时出错: {str(e)}')
             self.word_doc = None
             self.word_path = None
@@ -159,89 +527,361 @@ class DocumentManager:
         返回:
             bool: 打开成功返回True，否则返回False
         """
+        # 先保存当前文档中尚未保存的截图
+        self.flush_pending()
+        
         # 打开现有Word文档
-        file_path, _ = QFileDialog.getOpenFileName(
-            self.parent, '打开Word文档', '', 'Word Documents (*.docx)'
-        )
+        file_path = self._ask_file_path('打开Word文档', QFileDialog.AcceptOpen)
         
         if not file_path:
             logger.debug("用户取消了打开文档操作")
             return False
             
-        # 检查文件是否存在
-        if not os.path.exists(file_path):
+        # 打开一次文件即可完成存在、可读和大小检查，修改时间和内容取自同一个文件描述符
+        try:
+            with open(file_path, 'rb') as f:
+                file_stat = os.fstat(f.fileno())
+                data = f.read()
+        except FileNotFoundError:
             logger.error(f"文件不存在: {file_path}")
             QMessageBox.critical(self.parent, '错误', f'文件不存在: {file_path}')
             return False
-            
-        # 检查文件是否可读
-        if not os.access(file_path, os.R_OK):
+        except PermissionError:
             logger.error(f"文件无法读取: {file_path}")
             QMessageBox.critical(self.parent, '错误', f'文件无法读取: {file_path}')
             return False
-            
-        # 检查文件大小
-        try:
-            file_size = os.path.getsize(file_path)
-            if file_size == 0:
-                logger.error(f"文件为空: {file_path}")
-                QMessageBox.critical(self.parent, '错误', f'文件为空: {file_path}')
-                return False
         except Exception as e:
-            logger.error(f"检查文件大小时出错: {str(e)}")
+            logger.error(f"读取文件时出错: {str(e)}")
             QMessageBox.critical(self.parent, '错误', f'检查文件时出错: {str(e)}')
             return False
+        
+        # 检查文件大小
+        if not data:
+            logger.error(f"文件为空: {file_path}")
+            QMessageBox.critical(self.parent, '错误', f'文件为空: {file_path}')
+            return False
+        modified_time = file_stat.st_mtime_ns
             
         try:
-            logger.debug(f"尝试打开文档: {file_path}")
-            self.word_doc = Document(file_path)
+            logger.debug("尝试打开文档: %s", file_path)
+            from docx import Document
+            
+            # Document()解析成功即说明文档有效，无需再访问段落验证
+            new_doc = Document(io.BytesIO(data))
+            
+            # 关闭旧文档的截图日志，保存失败的截图留在日志中，下次打开旧文档时恢复
+            self._switch_journal()
+            self.word_doc = new_doc
             self.word_path = file_path
             
             # 记录文件的最后修改时间
-            self.last_modified_time = os.path.getmtime(file_path)
-            logger.debug(f"记录文件最后修改时间: {self.last_modified_time}")
+            self.last_modified_time = modified_time
+            self.last_digest = hashlib.blake2b(data, digest_size=16).digest()
+            self.last_part_crcs = _read_part_crcs(io.BytesIO(data))
+            logger.debug("记录文件最后修改时间: %s", self.last_modified_time)
             
-            # 验证文档是否有效
-            try:
-                _ = self.word_doc.paragraphs
-                logger.debug("文档有效，可以访问段落")
-                
-                # 保存原始文档内容的信息
-                self.save_original_content_info()
-                
-            except Exception as e:
-                logger.error(f"文档无效: {str(e)}")
-                QMessageBox.critical(self.parent, '错误', f'文档格式无效: {str(e)}')
-                self.word_doc = None
-                self.word_path = None
-                return False
-                
-            logger.info(f"成功打开文档: {file_path}")
+            # 保存原始文档内容的信息
+            self.save_original_content_info()
+            self._doc_valid = True
+            
+            logger.info("成功打开文档: %s", file_path)
+            
+            # 恢复上次程序异常退出时尚未写入文档的截图
+            recovered = self._open_journal()
+            if recovered:
+                # 先按恢复的截图重写日志，去掉已保存的记录和旧的保存标记，
+                # 使本次保存写入的标记计数与日志中的记录一一对应
+                with self._journal_lock:
+                    self._pending.extend(recovered)
+                    self._rewrite_journal()
+                logger.info("从截图日志恢复了 %s 张未保存的截图", len(recovered))
+                QMessageBox.information(
+                    self.parent, '恢复截图',
+                    f'已恢复 {len(recovered)} 张上次未保存的截图，将添加到文档末尾'
+                )
+                self.save_document()
             return True
                 
         except Exception as e:
-            logger.error(f"打开文档时出错: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.error(f"打开文档时出错: {str(e)}", exc_info=True)
             QMessageBox.critical(self.parent, '错误', f'打开文档时出错: {str(e)}')
             self.word_doc = None
             self.word_path = None
             return False
     
-    def save_document(self):
+    def _is_externally_modified(self):
+        """
+        修改时间变化后，确认文件内容是否真的被修改
+        优先比较zip中央目录中所有部件的CRC（只需读取目录），无法读取时比较整个文件的摘要
+        
+        返回:
+            bool: 任一部件的内容发生变化（或有部件增删）返回True
+        """
+        part_crcs = _read_part_crcs(self.word_path)
+        if part_crcs is not None and self.last_part_crcs is not None:
+            if part_crcs == self.last_part_crcs:
+                logger.debug("文件修改时间变化，但所有部件均未变化，无需合并")
+                return False
+            return True
+        return _file_digest(self.word_path) != self.last_digest
+    
+    def _ask_file_path(self, title, accept_mode):
+        """
+        显示文件对话框，选择要保存或打开的Word文档
+        对话框只创建一次并重复使用，避免部分桌面环境下每次创建对话框时漫长的初始化
+        
+        参数:
+            title: 字符串，对话框标题
+            accept_mode: QFileDialog.AcceptSave或QFileDialog.AcceptOpen
+            
+        返回:
+            str: 选择的文件路径，用户取消时返回空字符串
+        """
+        if self._file_dialog is None:
+            self._file_dialog = QFileDialog(self.parent)
+            self._file_dialog.setNameFilter('Word Documents (*.docx)')
+            self._file_dialog.setOption(QFileDialog.DontResolveSymlinks, True)
+        
+        dialog = self._file_dialog
+        dialog.setWindowTitle(title)
+        dialog.setAcceptMode(accept_mode)
+        if accept_mode == QFileDialog.AcceptSave:
+            dialog.setFileMode(QFileDialog.AnyFile)
+        else:
+            dialog.setFileMode(QFileDialog.ExistingFile)
+        
+        if not dialog.exec_():
+            return ''
+        selected = dialog.selectedFiles()
+        return selected[0] if selected else ''
+    
+    def save_document(self, wait=True):
         """
         保存文档
         如果文档已被外部修改，会提示用户选择合并或覆盖
+        
+        参数:
+            wait: 是否等待后台写入完成，为False时写入失败会在之后由定时器提示
+            
+        返回:
+            bool: 保存成功返回True，否则返回False；不等待时写入已提交即返回True
+        """
+        # 合并对话框显示期间定时器和热键仍会触发保存，此时直接跳过
+        if self._saving:
+            logger.debug("文档正在保存中，跳过本次保存")
+            return False
+        
+        self._saving = True
+        try:
+            return self._save_document(wait)
+        finally:
+            self._saving = False
+    
+    def flush_pending(self, wait=True):
+        """
+        如果有尚未保存的截图，则一次性插入文档并保存
+        由定时器定期调用，也在关闭或切换文档前调用
+        
+        参数:
+            wait: 是否等待后台写入完成
+        """
+        if wait:
+            # 关闭或切换文档前，确保之前提交的写入已经完成
+            self._collect_save_result(wait=True)
+        
+        if (self._pending or self._encode_futures) and self.word_doc and self.word_path:
+            logger.debug("保存待处理的截图，数量: %s", len(self._pending) + len(self._encode_futures))
+            self.save_document(wait=wait)
+    
+    def _on_autosave_timer(self):
+        """
+        定时器回调，提示后台写入的错误并保存待处理的截图
+        用户取消过保存时等待下一次截图或手动保存
+        """
+        self._collect_save_result(wait=False)
+        if not self._autosave_paused:
+            self.flush_pending(wait=False)
+        
+        # 后台写入或截图编码尚未完成时继续计时，以便写入失败后能及时提示，编码完成的截图也能及时保存
+        if self._save_future is not None or self._encode_futures:
+            self._autosave_timer.start(AUTOSAVE_DELAY * 1000)
+    
+    def _collect_save_result(self, wait):
+        """
+        获取上一次后台写入的结果，写入失败时提示用户
+        必须在主线程中调用
+        
+        参数:
+            wait: 写入尚未完成时是否等待
+            
+        返回:
+            bool: 没有写入或写入成功返回True，写入失败返回False
+        """
+        future = self._save_future
+        if future is None or (not wait and not future.done()):
+            return True
+        
+        self._save_future = None
+        try:
+            future.result()
+            return True
+        except Exception as e:
+            logger.error(f"保存文档时出错: {str(e)}", exc_info=True)
+            
+            # 显示错误消息
+            if self.parent:
+                QMessageBox.critical(self.parent, '保存失败', f'保存文档时出错: {str(e)}')
+            return False
+    
+    def _collect_encode_results(self, wait=True):
+        """
+        获取截图编码任务的结果，编码失败时提示用户
+        必须在主线程中调用
+        
+        参数:
+            wait: 是否等待所有编码任务完成，为False时只处理已完成的任务
+        """
+        if wait:
+            futures, self._encode_futures = self._encode_futures, []
+        else:
+            futures = [future for future in self._encode_futures if future.done()]
+            self._encode_futures = [future for future in self._encode_futures if not future.done()]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"添加截图到Word文档失败: {str(e)}", exc_info=True)
+                if self.parent:
+                    QMessageBox.critical(self.parent, '错误', f'添加截图到Word文档失败: {str(e)}')
+    
+    def _write_document(self, path, backup=True):
+        """
+        插入待保存的截图并写入文件，在后台线程中执行
+        
+        参数:
+            path: 字符串，目标文件路径
+            backup: 是否在替换前为原文件保留备份
+        """
+        with self._doc_lock:
+            try:
+                self._insert_pending()
+                saved_count = self._applied_count
+                # 替换文件前先在日志中标记已写入的截图，替换后、重写日志前崩溃也不会重复恢复
+                saved_stat, digest = self._atomic_save(
+                    path, backup, before_replace=lambda d: self._journal_mark_saved(saved_count, d)
+                )
+            except OSError:
+                # 文件被占用、磁盘已满等I/O错误不影响内存中的文档，下次保存重试即可
+                raise
+            except Exception:
+                # 插入或序列化失败说明内存中的文档已损坏，停止继续添加截图
+                self._doc_valid = False
+                raise
+            
+            # 更新文档信息
+            self.original_paragraph_count = _count_paragraphs(self.word_doc)
+            self.original_rels_count = len(self.word_doc.part.rels)
+            self.original_rel_ids = frozenset(self.word_doc.part.rels.keys())
+            logger.debug("保存原始文档信息：%s段落，%s个关系", self.original_paragraph_count, self.original_rels_count)
+            
+            # 移除已保存的截图，写入期间新加入的截图保留到下次保存
+            with self._journal_lock:
+                del self._pending[:saved_count]
+                self._rewrite_journal()
+            self._applied_count = 0
+            
+            # 更新最后修改时间
+            self.last_modified_time = saved_stat.st_mtime_ns
+            self.last_digest = digest
+            self.last_part_crcs = _read_part_crcs(path)
+            logger.debug("更新文件最后修改时间: %s", self.last_modified_time)
+        
+        logger.info("文档已成功保存: %s", path)
+    
+    def _insert_pending(self):
+        """
+        将尚未插入文档的截图依次添加到word_doc
+        """
+        from docx.shared import Inches
+        from docx.oxml import OxmlElement
+        from docx.text.paragraph import Paragraph
+        
+        # 直接在缓存的插入位置插入段落元素，add_paragraph/add_picture每次都要从头扫描正文查找sectPr
+        insert = self._body_inserter()
+        
+        for text, image_bytes in self._pending[self._applied_count:]:
+            # 添加文本说明（如果有）
+            if text:
+                p = OxmlElement('w:p')
+                insert(p)
+                Paragraph(p, self.word_doc._body).add_run(text)
+            
+            # 添加图片
+            p = OxmlElement('w:p')
+            insert(p)
+            Paragraph(p, self.word_doc._body).add_run().add_picture(
+                io.BytesIO(image_bytes), width=Inches(IMAGE_WIDTH_INCHES)
+            )
+            
+            # 添加空行（空段落无需包装对象）
+            insert(OxmlElement('w:p'))
+            self._applied_count += 1
+        
+        logger.debug("已将 %s 张截图插入文档", self._applied_count)
+    
+    def _save_document(self, wait):
+        """
+        保存文档的具体实现，由save_document调用
+        在主线程中处理外部修改和合并，文件写入交给后台线程
         """
+        from docx.shared import Inches
+        from docx.oxml import OxmlElement
+        from docx.oxml.ns import qn
+        from docx.text.paragraph import Paragraph
+        from docx.opc.constants import RELATIONSHIP_TYPE as RT
+        
+        if not wait:
+            # 定时器或截图数量触发的保存不阻塞界面：只处理已完成的编码任务，
+            # 上一次写入尚未完成或还没有编码完成的截图时，稍后由定时器重试
+            self._collect_encode_results(wait=False)
+            self._collect_save_result(wait=False)
+            if self._save_future is not None or not self._pending:
+                logger.debug("后台写入或截图编码尚未完成，稍后再保存")
+                self._autosave_timer.start(AUTOSAVE_DELAY * 1000)
+                return True
+        
+        # 等待上一次写入完成，否则正在写入的文件会被误认为被外部修改
+        self._collect_save_result(wait=True)
+        # 等待已提交的截图编码完成，确保本次保存包含所有已添加的截图（不等待时只包含已编码的截图）
+        self._collect_encode_results(wait=wait)
+        
         try:
-            logger.debug(f"尝试保存文档: {self.word_path}")
+            logger.debug("尝试保存文档: %s", self.word_path)
+            
+            # 用户选择覆盖外部修改时不再备份被放弃的文件
+            backup = True
+            
+            # 检查文件是否存在且已被修改（一次stat同时完成两项检查）
+            try:
+                current_stat = os.stat(self.word_path)
+                current_modified_time = current_stat.st_mtime_ns
+            except FileNotFoundError:
+                current_stat = None
+                current_modified_time = None
             
-            # 检查文件是否存在且已被修改
-            if os.path.exists(self.word_path):
-                current_modified_time = os.path.getmtime(self.word_path)
-                logger.debug(f"当前文件修改时间: {current_modified_time}, 上次记录的修改时间: {self.last_modified_time}")
+            if current_modified_time is not None:
+                logger.debug("当前文件修改时间: %s, 上次记录的修改时间: %s", current_modified_time, self.last_modified_time)
                 
-                # 检查文件是否被外部修改
+                # 检查文件是否被外部修改：修改时间变化时再确认内容，
+                # 避免修改时间精度或抖动导致误报，也避免为此重新解析整个文档
+                externally_modified = False
                 if current_modified_time != self.last_modified_time:
+                    externally_modified = self._is_externally_modified()
+                    if not externally_modified:
+                        # 内容未变（如touch、备份工具），记录新的修改时间，之后无需再次确认
+                        self.last_modified_time = current_modified_time
+                
+                if externally_modified:
                     logger.warning(f"检测到文件已被外部修改: {self.word_path}")
                     
                     # 创建合并确认对话框
@@ -264,162 +904,116 @@ class DocumentManager:
                     
                     # 获取用户点击的按钮
                     clicked_button = merge_msg_box.clickedButton()
-                    logger.debug(f"用户点击的按钮: {clicked_button.text()}")
+                    logger.debug("用户点击的按钮: %s", clicked_button.text())
                     
                     # 处理用户选择
                     if clicked_button == merge_button:
                         # 用户选择合并
                         logger.info("用户选择合并文档")
                         try:
-                            # 打开当前文档
-                            current_doc = Document(self.word_path)
-                            logger.debug("成功打开当前文档")
+                            # 打开当前文档，段落数量没有变化时无需完整解析
+                            disk_doc = _LazyDocument(self.word_path)
                             
-                            # 比较段落数量
-                            current_paragraphs_count = len(current_doc.paragraphs)
-                            original_paragraphs_count = len(self.word_doc.paragraphs)
-                            logger.debug(f"原始段落数: {original_paragraphs_count}, 当前段落数: {current_paragraphs_count}")
+                            # 比较段落数量；同一版本的文件（修改时间和大小相同）只统计一次
+                            meta_key = (current_stat.st_mtime_ns, current_stat.st_size)
+                            current_paragraphs_count = self._extmeta_cache.get(meta_key)
+                            if current_paragraphs_count is None:
+                                current_paragraphs_count = disk_doc.paragraph_count
+                                self._extmeta_cache[meta_key] = current_paragraphs_count
+                            original_paragraphs_count = self.original_paragraph_count
+                            logger.debug("原始段落数: %s, 当前段落数: %s", original_paragraphs_count, current_paragraphs_count)
                             
                             # 检查是否有内容变化（增加或删除）
+                            document_replaced = False
                             if current_paragraphs_count != original_paragraphs_count:
-                                logger.info(f"检测到内容变化: 原始={original_paragraphs_count}, 当前={current_paragraphs_count}")
+                                logger.info("检测到内容变化: 原始=%s, 当前=%s", original_paragraphs_count, current_paragraphs_count)
+                                current_doc = disk_doc.materialize()
+                                logger.debug("成功打开当前文档")
                                 
                                 # 如果当前文档段落数更多，说明有新增内容
                                 if current_paragraphs_count > original_paragraphs_count:
                                     new_paragraphs_count = current_paragraphs_count - original_paragraphs_count
-                                    logger.info(f"检测到 {new_paragraphs_count} 个新增段落")
+                                    logger.info("检测到 %s 个新增段落", new_paragraphs_count)
                                     
-                                    # 复制新增段落
-                                    for i in range(original_paragraphs_count, current_paragraphs_count):
-                                        para = current_doc.paragraphs[i]
-                                        new_para = self.word_doc.add_paragraph()
-                                        new_para.text = para.text
-                                        logger.debug(f"复制段落 {i}: {para.text[:50]}...")
+                                    # 复制新增段落：直接克隆段落XML，保留字体、颜色、样式等格式
+                                    # 用islice直接跳到新增的段落元素，不为前面的段落创建Paragraph对象
+                                    added_elements = islice(
+                                        current_doc.element.body.iterchildren(qn('w:p')),
+                                        original_paragraphs_count, None
+                                    )
+                                    # 段落必须位于sectPr之前，使用缓存的插入位置，
+                                    # 逐个add_paragraph每次都要从头扫描正文查找sectPr
+                                    insert = self._body_inserter()
+                                    # 段落文本需要拼接所有run，只在确实输出调试日志时才读取
+                                    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+                                    for i, p in enumerate(added_elements, original_paragraphs_count):
+                                        if _has_relationship_refs(p):
+                                            # 图片、超链接等引用的关系在本文档中不存在，只复制文本
+                                            new_p = OxmlElement('w:p')
+                                            Paragraph(new_p, self.word_doc._body).text = Paragraph(p, current_doc._body).text
+                                        else:
+                                            new_p = deepcopy(p)
+                                        
+                                        insert(new_p)
+                                        if debug_enabled:
+                                            logger.debug("复制段落 %s: %.50s...", i, Paragraph(p, current_doc._body).text)
                                     
                                 else:
                                     # 如果当前文档段落数更少，说明有删除的内容
                                     deleted_paragraphs_count = original_paragraphs_count - current_paragraphs_count
-                                    logger.info(f"检测到 {deleted_paragraphs_count} 个段落被删除")
+                                    logger.info("检测到 %s 个段落被删除", deleted_paragraphs_count)
                                     
                                     # 在这种情况下，我们应该使用当前文档的内容作为基础
                                     logger.info("使用当前文档的内容作为基础")
                                     
-                                    # 保存当前要添加的图片（如果有）
-                                    current_image_to_add = None
-                                    current_text_description = None
-                                    if hasattr(self, 'current_image_path') and self.current_image_path:
-                                        logger.debug(f"保存当前要添加的图片: {self.current_image_path}")
-                                        current_image_to_add = self.current_image_path
-                                        # 如果有文本说明，也保存它
-                                        if hasattr(self, 'current_text_description') and self.current_text_description:
-                                            current_text_description = self.current_text_description
-                                            logger.debug(f"保存当前文本说明: {current_text_description}")
-                                    
-                                    # 使用当前文档替换原始文档
+                                    # 使用当前文档替换原始文档，待保存的截图稍后重新插入
                                     self.word_doc = current_doc
-                                    
-                                    # 如果有图片要添加，现在添加它
-                                    manually_added_image = False
-                                    if current_image_to_add:
-                                        # 如果有文本说明，先添加它
-                                        if current_text_description:
-                                            logger.debug(f"合并后添加文本说明: {current_text_description}")
-                                            self.word_doc.add_paragraph(current_text_description)
-                                        
-                                        logger.debug(f"合并后添加当前图片: {current_image_to_add}")
-                                        self.word_doc.add_picture(current_image_to_add, width=Inches(6))
-                                        self.word_doc.add_paragraph()  # 添加空行
-                                        manually_added_image = True
-                                        logger.debug("已手动添加图片，将跳过自动检测新增图片关系")
+                                    self._applied_count = 0
+                                    document_replaced = True
+                                    logger.debug("已使用当前文档替换，将跳过自动检测新增图片关系")
                                 
                                 # 检查关系数量（用于判断是否有新增图片）
                                 current_rels_count = len(current_doc.part.rels)
-                                current_rel_ids = set(current_doc.part.rels.keys())
-                                logger.debug(f"原始关系数: {self.original_rels_count}, 当前关系数: {current_rels_count}")
+                                logger.debug("原始关系数: %s, 当前关系数: %s", self.original_rels_count, current_rels_count)
                                 
-                                # 检查是否有新增的图片关系，但如果已手动添加图片则跳过
-                                if not manually_added_image:
-                                    if hasattr(self, 'original_rel_ids'):
-                                        new_rel_ids = current_rel_ids - self.original_rel_ids
-                                    else:
-                                        new_rel_ids = current_rel_ids
-                                        
+                                # 检查是否有新增的图片关系，文档已被替换时图片已包含在内，无需复制
+                                if not document_replaced:
+                                    # 字典的键视图直接与frozenset求差，无需先复制为集合
+                                    new_rel_ids = current_doc.part.rels.keys() - self.original_rel_ids
+                                    
                                     if new_rel_ids:
-                                        logger.info(f"检测到 {len(new_rel_ids)} 个新增关系")
+                                        logger.info("检测到 %s 个新增关系", len(new_rel_ids))
                                         
-                                        # 使用更健壮的方式复制新增图片
+                                        # 直接从内存复制新增图片，无需经过临时文件
+                                        # python-docx按图片内容的SHA-1复用已有的图片部件和关系，
+                                        # 同一张图片出现多次时文档中只保存一份
                                         try:
-                                            # 创建临时目录用于存储图片
-                                            app_dir = os.path.abspath(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-                                            temp_dir = os.path.join(app_dir, 'temp_merge_images')
-                                            os.makedirs(temp_dir, exist_ok=True)
-                                            logger.debug(f"创建临时目录用于存储合并图片: {temp_dir}")
-                                            
-                                            # 复制新增图片
                                             image_count = 0
-                                            temp_files = []  # 记录创建的临时文件
-                                            
                                             for rel_id in new_rel_ids:
                                                 try:
                                                     rel = current_doc.part.rels[rel_id]
                                                     if rel.reltype == RT.IMAGE:
-                                                        logger.debug(f"处理新增图片关系: {rel_id}")
-                                                        image_count += 1
+                                                        logger.debug("处理新增图片关系: %s", rel_id)
                                                         # 获取图片二进制数据
                                                         image_part = rel._target
                                                         if hasattr(image_part, 'blob'):
-                                                            # 保存图片到临时文件
-                                                            img_ext = os.path.splitext(rel.target_ref)[1]
-                                                            if not img_ext:
-                                                                img_ext = ".png"  # 默认扩展名
-                                                            
-                                                            temp_img_path = os.path.join(
-                                                                temp_dir, f'merge_image_{image_count}{img_ext}'
-                                                            )
-                                                            logger.debug(f"保存新增图片到临时文件: {temp_img_path}")
-                                                            
-                                                            with open(temp_img_path, 'wb') as f:
-                                                                f.write(image_part.blob)
-                                                            
-                                                            # 将图片添加到文档
-                                                            self.word_doc.add_picture(temp_img_path, width=Inches(6))
-                                                            
-                                                            # 添加到临时文件列表
-                                                            temp_files.append(temp_img_path)
-                                                            
-                                                            logger.debug(f"成功复制图片 {image_count} 到合并文档")
+                                                            image_count += 1
+                                                            self.word_doc.add_picture(io.BytesIO(image_part.blob), width=Inches(IMAGE_WIDTH_INCHES))
+                                                            logger.debug("成功复制图片 %s 到合并文档", image_count)
                                                 except Exception as img_error:
-                                                    logger.error(f"处理图片时出错: {str(img_error)}")
-                                                    logger.error(traceback.format_exc())
+                                                    logger.error(f"处理图片时出错: {str(img_error)}", exc_info=True)
                                                     continue
                                             
-                                            logger.info(f"成功复制 {image_count} 张新增图片到合并文档")
-                                            
-                                            # 清理临时文件
-                                            for temp_file in temp_files:
-                                                try:
-                                                    os.remove(temp_file)
-                                                    logger.debug(f"已删除临时文件: {temp_file}")
-                                                except Exception as e:
-                                                    logger.warning(f"删除临时文件失败: {str(e)}")
-                                            
-                                            # 删除临时目录
-                                            try:
-                                                os.rmdir(temp_dir)
-                                                logger.debug(f"已删除临时目录: {temp_dir}")
-                                            except Exception as e:
-                                                logger.warning(f"删除临时目录失败: {str(e)}")
+                                            logger.info("成功复制 %s 张新增图片到合并文档", image_count)
                                             
                                         except Exception as img_copy_error:
-                                            logger.error(f"复制图片过程中出错: {str(img_copy_error)}")
-                                            logger.error(traceback.format_exc())
+                                            logger.error(f"复制图片过程中出错: {str(img_copy_error)}", exc_info=True)
                             else:
                                 logger.info("文档段落数量相同，无需合并段落")
                             
                             logger.info("文档合并成功")
                         except Exception as e:
-                            logger.error(f"合并文档时出错: {str(e)}")
-                            logger.error(traceback.format_exc())
+                            logger.error(f"合并文档时出错: {str(e)}", exc_info=True)
                             
                             # 提示用户合并失败
                             error_msg_box = QMessageBox(self.parent)
@@ -441,63 +1035,287 @@ class DocumentManager:
                             # 获取用户点击的按钮
                             if error_msg_box.clickedButton() == cancel_button:
                                 logger.info("用户取消了保存操作")
+                                self._autosave_paused = True
                                 return False
+                            backup = False
                     
                     elif clicked_button == overwrite_button:
                         # 用户选择覆盖
                         logger.info("用户选择覆盖文件")
+                        # 用户明确放弃外部修改，无需再为其保留备份
+                        backup = False
                     
                     elif clicked_button == cancel_button:
                         # 用户选择取消
                         logger.info("用户取消了保存操作")
+                        self._autosave_paused = True
                         return False
             
-            # 创建备份文件
-            backup_path = f"{self.word_path}.bak"
-            try:
-                shutil.copy2(self.word_path, backup_path)
-                logger.debug(f"已创建备份文件: {backup_path}")
-            except Exception as e:
-                logger.warning(f"创建备份文件失败: {str(e)}")
-            
-            # 保存文档
-            try:
-                self.word_doc.save(self.word_path)
-                # 更新文档信息
-                self.original_rels_count = len(self.word_doc.part.rels)
-                self.original_rel_ids = set(self.word_doc.part.rels.keys())
-                logger.debug(f"保存原始文档信息：{len(self.word_doc.paragraphs)}段落，{self.original_rels_count}个关系")
-                logger.info(f"文档已成功保存: {self.word_path}")
-                
-                # 更新最后修改时间
-                self.last_modified_time = os.path.getmtime(self.word_path)
-                logger.debug(f"更新文件最后修改时间: {self.last_modified_time}")
-                
+            # 合并完成后在后台插入待保存的截图并写入，合并时不会丢失或重复
+            self._autosave_paused = False
+            self._save_future = self._save_executor.submit(self._write_document, self.word_path, backup)
+            if not wait:
                 return True
-            except Exception as e:
-                logger.error(f"保存文档时出错: {str(e)}")
-                logger.error(traceback.format_exc())
-                
-                # 如果保存失败，尝试恢复备份
-                if os.path.exists(backup_path):
-                    try:
-                        shutil.copy2(backup_path, self.word_path)
-                        logger.info("已恢复备份文件")
-                    except Exception as backup_error:
-                        logger.error(f"恢复备份文件失败: {str(backup_error)}")
-                
-                # 显示错误消息
-                if self.parent:
-                    QMessageBox.critical(self.parent, '保存失败', f'保存文档时出错: {str(e)}')
-                return False
+            return self._collect_save_result(wait=True)
             
         except Exception as e:
-            logger.error(f"保存文档过程中出错: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.error(f"保存文档过程中出错: {str(e)}", exc_info=True)
             if self.parent:
                 QMessageBox.critical(self.parent, '错误', f'保存文档过程中出错: {str(e)}')
             return False
     
+    def _atomic_save(self, path, backup=True, before_replace=None):
+        """
+        将文档原子地保存到指定路径
+        先写入临时文件，再用os.replace替换目标文件，保存失败时原文件保持不变
+        
+        参数:
+            path: 字符串，目标文件路径
+            backup: 是否在替换前为原文件保留备份
+            before_replace: 可选的回调函数，替换目标文件前以新文件内容的摘要调用
+            
+        返回:
+            tuple: (os.stat_result, bytes)，写入完成后的文件状态（重命名不改变修改时间，可直接用于记录）
+                   和文件内容的摘要
+        """
+        # 在目标目录中创建唯一的临时文件，保证os.replace不跨文件系统，且不会与其他保存冲突
+        fd, temp_path = tempfile.mkstemp(suffix=".docx.tmp", dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            # 写入后立即fsync，确保替换后的文件内容已落盘
+            with os.fdopen(fd, 'wb') as f:
+                _save_package(self.word_doc, f)
+                f.flush()
+                os.fsync(f.fileno())
+                saved_stat = os.fstat(f.fileno())
+            
+            # mkstemp创建的文件权限为0600，改为与原文件一致（新文件按umask）
+            try:
+                mode = stat.S_IMODE(os.stat(path).st_mode)
+            except FileNotFoundError:
+                mode = 0o666 & ~_UMASK
+            os.chmod(temp_path, mode)
+            
+            # 替换前为上一版本保留备份
+            if backup:
+                self._backup_if_stale(path)
+            
+            digest = _file_digest(temp_path)
+            if before_replace is not None:
+                before_replace(digest)
+            
+            # os.replace在POSIX和Windows上都会原子地覆盖已存在的目标文件
+            os.replace(temp_path, path)
+        except Exception:
+            # 清理残留的临时文件
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        
+        # 同步目录项，确保重命名在断电后依然有效（Windows不支持打开目录）
+        if os.name != 'nt':
+            try:
+                dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+                try:
+                    os.fsync(dir_fd)
+                finally:
+                    os.close(dir_fd)
+            except OSError as e:
+                logger.debug("同步目录失败: %s", e)
+        
+        return saved_stat, digest
+    
+    def _backup_if_stale(self, path):
+        """
+        距上次备份超过BACKUP_INTERVAL时，将当前文件备份为.bak
+        优先使用硬链接，os.replace替换目标后备份仍指向旧版本，无需复制数据
+        
+        参数:
+            path: 字符串，要备份的文件路径
+        """
+        if not BACKUP_INTERVAL:
+            return
+        if self._last_backup_ts is not None and time.monotonic() - self._last_backup_ts < BACKUP_INTERVAL:
+            return
+        
+        backup_path = path + ".bak"
+        try:
+            try:
+                os.remove(backup_path)
+            except FileNotFoundError:
+                pass
+            
+            try:
+                os.link(path, backup_path)
+            except FileNotFoundError:
+                raise
+            except OSError:
+                # 不支持硬链接的文件系统（如FAT32、部分网络盘）退回到复制
+                shutil.copyfile(path, backup_path)
+            
+            self._last_backup_ts = time.monotonic()
+            logger.debug("已创建备份文件: %s", backup_path)
+        except FileNotFoundError:
+            # 首次保存时还没有可备份的文件
+            pass
+        except Exception as e:
+            logger.warning(f"创建备份文件失败: {str(e)}")
+    
+    def _open_journal(self):
+        """
+        打开当前文档的截图日志，读取上次未写入文档的截图
+        
+        返回:
+            list: 日志中记录的截图 (说明文字, PNG数据)
+        """
+        self._close_journal()
+        journal_dir = _journal_dir(self.word_path)
+        journal_path = os.path.join(journal_dir, JOURNAL_FILE)
+        image_dir = os.path.join(journal_dir, JOURNAL_IMAGE_DIR)
+        
+        recovered = []
+        try:
+            with open(journal_path, 'r', encoding='utf-8') as f:
+                entries = _parse_journal(f, self.last_digest)
+            for entry in entries:
+                try:
+                    with open(os.path.join(image_dir, entry['image']), 'rb') as img:
+                        recovered.append((entry.get('caption', ''), img.read()))
+                except (KeyError, OSError) as e:
+                    logger.warning(f"跳过无法恢复的截图日志记录: {str(e)}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"读取截图日志失败: {str(e)}")
+        
+        try:
+            os.makedirs(image_dir, exist_ok=True)
+            self._journal = open(journal_path, 'a', encoding='utf-8', buffering=8192)
+        except Exception as e:
+            logger.warning(f"打开截图日志失败，未保存的截图将无法在崩溃后恢复: {str(e)}")
+            self._journal = None
+        return recovered
+    
+    def _journal_record(self, text, image_bytes):
+        """
+        将一张截图追加到截图日志，调用方需持有_journal_lock
+        
+        参数:
+            text: 字符串，截图的说明文本
+            image_bytes: bytes，截图的PNG数据
+        """
+        if self._journal is None:
+            return
+        
+        try:
+            image_dir = os.path.join(_journal_dir(self.word_path), JOURNAL_IMAGE_DIR)
+            
+            # 以内容哈希命名，相同截图只写一次；先写临时文件再替换，避免留下不完整的图片
+            digest = hashlib.sha256(image_bytes).hexdigest()
+            image_name = f"{digest}.png"
+            image_path = os.path.join(image_dir, image_name)
+            if not os.path.exists(image_path):
+                with open(image_path + ".tmp", 'wb') as f:
+                    f.write(image_bytes)
+                os.replace(image_path + ".tmp", image_path)
+            
+            entry = {
+                'ts': time.time(),
+                'caption': text,
+                'image': image_name,
+                'sha256': digest,
+            }
+            self._journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._journal.flush()
+        except Exception as e:
+            logger.warning(f"写入截图日志失败: {str(e)}")
+    
+    def _rewrite_journal(self):
+        """
+        文档保存后重写截图日志，只保留仍未写入文档的截图，调用方需持有_journal_lock
+        """
+        if self._journal is None:
+            return
+        
+        try:
+            self._journal.seek(0)
+            self._journal.truncate()
+            for text, image_bytes in self._pending:
+                self._journal_record(text, image_bytes)
+            
+            # 删除已不再被日志引用的图片
+            image_dir = os.path.join(_journal_dir(self.word_path), JOURNAL_IMAGE_DIR)
+            keep = {f"{hashlib.sha256(image_bytes).hexdigest()}.png" for _, image_bytes in self._pending}
+            try:
+                with os.scandir(image_dir) as entries:
+                    for entry in entries:
+                        if entry.name not in keep:
+                            os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+        except Exception as e:
+            logger.warning(f"重写截图日志失败: {str(e)}")
+    
+    def _journal_mark_saved(self, saved_count, digest):
+        """
+        在替换文档文件前向截图日志写入保存标记
+        替换完成后、重写日志前程序崩溃时，恢复时据此跳过已写入文档的截图
+        
+        参数:
+            saved_count: 整数，日志开头已写入新文件的截图数量
+            digest: bytes，新文件内容的摘要
+        """
+        with self._journal_lock:
+            if self._journal is None:
+                return
+            try:
+                self._journal.write(json.dumps({'saved': saved_count, 'digest': digest.hex()}) + "\n")
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+            except Exception as e:
+                logger.warning(f"写入截图日志保存标记失败: {str(e)}")
+    
+    def _close_journal(self, remove=False):
+        """
+        关闭截图日志文件
+        
+        参数:
+            remove: 是否同时删除日志文件和图片目录
+        """
+        with self._journal_lock:
+            if self._journal is not None:
+                try:
+                    self._journal.close()
+                except Exception as e:
+                    logger.warning(f"关闭截图日志失败: {str(e)}")
+                self._journal = None
+        
+        if remove and self.word_path:
+            self._discard_journal()
+    
+    def _switch_journal(self):
+        """
+        切换文档前关闭当前文档的截图日志并清空待保存的截图
+        """
+        # 编码线程会写入日志和_pending，先等待其完成
+        self._collect_encode_results()
+        self._close_journal(remove=not self._pending)
+        self._pending = []
+        self._extmeta_cache.clear()
+        self._applied_count = 0
+    
+    def _discard_journal(self):
+        """
+        删除当前文档的截图日志目录（日志文件和图片）
+        """
+        try:
+            shutil.rmtree(_journal_dir(self.word_path))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"删除截图日志失败: {str(e)}")
+    
     def add_screenshot(self, pixmap, text=""):
         """
         将截图添加到Word文档
@@ -516,101 +1334,26 @@ class DocumentManager:
                 logger.error("Word文档未打开")
                 raise Exception("Word文档未打开")
             
-            # 检查文档是否有效
-            try:
-                _ = self.word_doc.paragraphs
-            except Exception as e:
-                logger.error(f"Word文档无效: {str(e)}")
-                
-                # 尝试重新打开文档
-                try:
-                    logger.debug("尝试重新打开文档")
-                    self.word_doc = Document(self.word_path)
-                    
-                    # 再次检查文档是否有效
-                    _ = self.word_doc.paragraphs
-                    logger.debug("重新打开文档成功")
-                    
-                    # 更新最后修改时间记录
-                    self.last_modified_time = os.path.getmtime(self.word_path)
-                    logger.debug(f"更新文件最后修改时间: {self.last_modified_time}")
-                except Exception as reopen_error:
-                    logger.error(f"重新打开文档失败: {str(reopen_error)}")
-                    raise Exception(f"Word文档无效且无法重新打开: {str(e)}")
+            if not self._doc_valid:
+                logger.error("Word文档已损坏")
+                raise Exception("Word文档在上次保存时出错，请重新打开文档")
             
             # 检查pixmap是否有效
             if pixmap.isNull():
                 logger.error("截图无效，无法保存")
                 raise Exception("截图无效，无法保存")
             
-            # 创建临时目录（在应用程序目录下）
-            try:
-                # 获取应用程序目录
-                app_dir = os.path.abspath(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-                temp_dir = os.path.join(app_dir, 'temp_screenshots')
-                os.makedirs(temp_dir, exist_ok=True)
-                
-                # 添加更详细的日志
-                logger.info("=" * 50)
-                logger.info(f"临时截图文件夹路径: {temp_dir}")
-                logger.info(f"应用程序目录: {app_dir}")
-                logger.info(f"当前文件位置: {__file__}")
-                logger.info("=" * 50)
-                
-                logger.debug(f"创建临时目录: {temp_dir}")
-            except Exception as e:
-                logger.error(f"创建临时目录时出错: {str(e)}")
-                raise Exception(f"创建临时目录时出错: {str(e)}")
+            # 缩放和编码交给后台线程；QPixmap只能在主线程使用，先转换为线程安全的QImage
+            image = pixmap.toImage()
+            self._encode_futures.append(self._encode_executor.submit(self._encode_screenshot, image, text))
             
-            # 保存临时图片文件
-            try:
-                # 使用时间戳作为文件名，避免冲突
-                timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S%f")
-                temp_img_path = os.path.join(temp_dir, f'screenshot_{timestamp}.png')
-                logger.debug(f"保存临时图片: {temp_img_path}")
-                
-                saved = pixmap.save(temp_img_path)
-                if not saved:
-                    logger.error(f"保存临时图片失败: {temp_img_path}")
-                    raise Exception(f"保存临时图片失败: {temp_img_path}")
-                
-                # 保存当前图片路径，用于合并时使用
-                self.current_image_path = temp_img_path
-                self.current_text_description = text
-                logger.debug(f"保存当前图片路径: {self.current_image_path}")
-                
-            except Exception as e:
-                logger.error(f"保存临时图片时出错: {str(e)}")
-                raise Exception(f"保存临时图片时出错: {str(e)}")
+            # 待保存的截图较多时立即保存，否则在截图停止AUTOSAVE_DELAY秒后保存
+            self._autosave_paused = False
+            if len(self._pending) + len(self._encode_futures) >= AUTOSAVE_MAX_PENDING:
+                self.save_document(wait=False)
+            self._autosave_timer.start(AUTOSAVE_DELAY * 1000)
             
-            # 添加截图到Word文档
-            try:
-                # 添加文本说明（如果有）
-                if text:
-                    self.word_doc.add_paragraph(text)
-                
-                # 添加图片
-                self.word_doc.add_picture(temp_img_path, width=Inches(6))
-                
-                # 添加空行
-                self.word_doc.add_paragraph()
-                
-                logger.info("成功添加截图到Word文档")
-                
-                # 自动保存文档
-                if self.save_document():
-                    # 更新最后修改时间记录
-                    self.last_modified_time = os.path.getmtime(self.word_path)
-                    logger.debug(f"更新文件最后修改时间: {self.last_modified_time}")
-                
-                # 清除当前图片路径
-                self.current_image_path = None
-                self.current_text_description = None
-                
-                return True
-            except Exception as e:
-                logger.error(f"添加截图到Word文档时出错: {str(e)}")
-                raise Exception(f"添加截图到Word文档时出错: {str(e)}")
+            return True
             
         except Exception as e:
             logger.error(f"添加截图到Word文档失败: {str(e)}")
@@ -618,6 +1361,38 @@ class DocumentManager:
                 QMessageBox.critical(self.parent, '错误', f'添加截图到Word文档失败: {str(e)}')
             return False
     
+    def _encode_screenshot(self, image, text):
+        """
+        缩放截图并编码为PNG，加入待保存队列和截图日志，在编码线程中执行
+        
+        参数:
+            image: QImage对象，要添加的截图
+            text: 字符串，截图的说明文本
+        """
+        # 文档中按固定宽度显示，缩小过大的截图以减小文档体积
+        target_width = int(IMAGE_WIDTH_INCHES * IMAGE_TARGET_DPI)
+        if image.width() > target_width:
+            logger.debug("缩小截图: %sx%s -> 宽度 %s", image.width(), image.height(), target_width)
+            image = image.scaledToWidth(target_width, Qt.SmoothTransformation)
+        
+        # 将截图编码为内存中的PNG数据，无需写入临时文件
+        # 以WriteOnly打开会清空复用的缓冲区，但保留已分配的容量
+        buffer = QBuffer(self._encode_buf)
+        buffer.open(QIODevice.WriteOnly)
+        saved = image.save(buffer, "PNG", SCREENSHOT_PNG_QUALITY)
+        buffer.close()
+        if not saved:
+            raise Exception("截图编码为PNG失败")
+        image_bytes = bytes(self._encode_buf)
+        logger.debug("截图编码完成，大小: %s 字节", len(image_bytes))
+        
+        # 暂存截图，保存文档时再统一插入，连续截图只需重写一次文档
+        # 同时记入截图日志，保存前程序崩溃也不会丢失
+        with self._journal_lock:
+            self._pending.append((text, image_bytes))
+            self._journal_record(text, image_bytes)
+        logger.info("截图已加入待保存队列，当前数量: %s", len(self._pending))
+    
     def close_document(self, ask_save=True):
         """
         关闭当前文档
@@ -631,6 +1406,9 @@ class DocumentManager:
         if not self.word_doc or not self.word_path:
             logger.debug("没有打开的文档，无需关闭")
             return True
+        
+        # 截图在添加后即应保存，关闭前先保存尚未保存的截图
+        self.flush_pending()
             
         if ask_save:
             # 询问用户是否保存
@@ -658,26 +1436,61 @@ class DocumentManager:
                         return False
         
         # 关闭文档
+        # python-docx的部件和lxml元素之间存在循环引用，先清空正文断开引用再回收内存
+        try:
+            self.word_doc.element.body.clear()
+        except Exception as e:
+            logger.debug("清空文档正文失败: %s", e)
         self.word_doc = None
+        gc.collect()
+        
+        # 所有截图都已写入文档时删除日志，否则保留日志以便下次打开时恢复
+        self._collect_encode_results()
+        self._close_journal(remove=not self._pending)
         self.word_path = None
+        self._doc_valid = False
+        self._pending = []
+        self._extmeta_cache.clear()
+        self._insert_point = (None, None)
+        self._applied_count = 0
+        self._autosave_paused = False
+        self._last_backup_ts = None
         logger.info("文档已关闭")
         return True
     
+    def _body_inserter(self):
+        """
+        返回在正文末尾（sectPr之前）插入元素的函数
+        sectPr只在文档打开或替换后查找一次，之后的插入都是O(1)
+        
+        返回:
+            callable: 接受一个lxml元素并将其插入正文末尾
+        """
+        from docx.oxml.ns import qn
+        
+        body = self.word_doc.element.body
+        cached_body, sect_pr = self._insert_point
+        if cached_body is not body:
+            sect_pr = body.find(qn('w:sectPr'))
+            self._insert_point = (body, sect_pr)
+        return sect_pr.addprevious if sect_pr is not None else body.append
+    
     def save_original_content_info(self):
         """
         保存原始文档内容的信息，用于后续比较和合并
         """
         try:
             if self.word_doc:
-                # 保存段落内容
-                self.original_paragraphs = []
-                for para in self.word_doc.paragraphs:
-                    self.original_paragraphs.append(para.text)
+                # 保存段落数量（合并时只需要比较数量，无需保留段落文本）
+                self.original_paragraph_count = _count_paragraphs(self.word_doc)
                 
                 # 保存关系数量（用于图片计数）
                 self.original_rels_count = len(self.word_doc.part.rels)
+                self.original_rel_ids = frozenset(self.word_doc.part.rels.keys())
+                
+                # 文档已打开或替换，重新查找插入位置
+                self._insert_point = (None, None)
                 
-                logger.debug(f"保存原始文档信息：{len(self.original_paragraphs)}段落，{self.original_rels_count}个关系")
+                logger.debug("保存原始文档信息：%s段落，%s个关系", self.original_paragraph_count, self.original_rels_count)
         except Exception as e:
-            logger.error(f"保存原始文档内容信息时出错: {str(e)}")
-            logger.error(traceback.format_exc()) 
\ No newline at end of file
+            logger.error(f"保存原始文档内容信息时出错: {str(e)}", exc_info=True) 
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""
+屏幕抓取模块
+优先使用mss直接抓取主屏幕，未安装mss或抓取失败时使用Qt的grabWindow
+"""
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QImage, QPixmap
+from src.utils.logger import logger
+
+try:
+    import mss
+except ImportError:
+    mss = None
+
+class ScreenGrabber:
+    """
+    屏幕抓取器类
+    mss实例只创建一次并重复使用，避免每次截图都重新申请系统资源
+    只能在创建它的线程（GUI线程）中使用
+    """
+    
+    def __init__(self):
+        """
+        初始化屏幕抓取器
+        """
+        self._sct = None
+        self._mss_failed = mss is None
+        if self._mss_failed:
+            logger.debug("未安装mss，使用Qt抓取屏幕")
+            return
+        
+        # mss缓存了显示器列表和绘图句柄，屏幕布局变化后需要重新创建
+        app = QApplication.instance()
+        if app is not None:
+            app.primaryScreenChanged.connect(self._on_screens_changed)
+            app.screenAdded.connect(self._on_screen_added)
+            app.screenRemoved.connect(self._on_screens_changed)
+            for screen in app.screens():
+                screen.geometryChanged.connect(self._on_screens_changed)
+    
+    def _on_screen_added(self, screen):
+        """
+        新增屏幕时同样监听其分辨率变化
+        
+        参数:
+            screen: QScreen对象，新增的屏幕
+        """
+        screen.geometryChanged.connect(self._on_screens_changed)
+        self._on_screens_changed()
+    
+    def _on_screens_changed(self, *args):
+        """
+        屏幕增减、主屏幕切换或分辨率变化时释放mss实例，下次截图时按新布局重新创建
+        """
+        logger.debug("屏幕布局已变化，重新创建mss实例")
+        self.close()
+    
+    def grab(self):
+        """
+        抓取主屏幕
+        
+        返回:
+            QPixmap: 主屏幕截图，无法获取主屏幕时返回None
+        """
+        screen = QApplication.primaryScreen()
+        if screen is None:
+            logger.error("无法获取主屏幕")
+            return None
+        
+        if not self._mss_failed:
+            try:
+                pixmap = self._grab_mss(screen)
+                if pixmap is not None:
+                    return pixmap
+            except Exception as e:
+                # mss在当前平台不可用（如Wayland），之后不再尝试
+                logger.warning(f"使用mss抓取屏幕失败，改用Qt: {str(e)}")
+                self._mss_failed = True
+                self.close()
+        
+        return screen.grabWindow(0)
+    
+    def _grab_mss(self, screen):
+        """
+        使用mss抓取与Qt主屏幕对应的显示器
+        
+        参数:
+            screen: QScreen对象，主屏幕
+        
+        返回:
+            QPixmap: 截图，找不到对应的显示器时返回None
+        """
+        if self._sct is None:
+            self._sct = mss.mss()
+        
+        # 按物理像素匹配显示器，mss的显示器顺序不一定以主屏幕开头
+        ratio = screen.devicePixelRatio()
+        geometry = screen.geometry()
+        target = (round(geometry.x() * ratio), round(geometry.y() * ratio),
+                  round(geometry.width() * ratio), round(geometry.height() * ratio))
+        for monitor in self._sct.monitors[1:]:
+            if (monitor['left'], monitor['top'], monitor['width'], monitor['height']) == target:
+                break
+        else:
+            logger.debug("mss中没有与主屏幕一致的显示器，使用Qt抓取: %s", target)
+            return None
+        
+        shot = self._sct.grab(monitor)
+        width, height = shot.size
+        # BGRA字节序在小端机器上即为QImage的RGB32格式；fromImage会复制数据，无需保留shot
+        image = QImage(shot.bgra, width, height, width * 4, QImage.Format_RGB32)
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(ratio)
+        return pixmap
+    
+    def close(self):
+        """
+        释放mss占用的系统资源
+        """
+        if self._sct is not None:
+            try:
+                self._sct.close()
+            except Exception as e:
+                logger.debug("关闭mss失败: %s", e)
+            self._sct = None
@@ -3,15 +3,130 @@
 用于处理截图的捕获和处理
 """
 
-import time
-import traceback
+import datetime
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5.QtWidgets import QApplication, QMessageBox, QDialog, QSystemTrayIcon
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, QBuffer, QByteArray, QIODevice
 from PyQt5.QtGui import QPixmap
 from src.utils.logger import logger
 from src.ui.screenshot_dialog import ScreenshotDialog
 from src.ui.capture_window import CaptureWindow
-import datetime
+from src.core.screen_grabber import ScreenGrabber
+
+# 隐藏悬浮球或主窗口后，等待窗口管理器完成重绘再截图的时间（毫秒），没有可用的隐藏信号时使用
+HIDE_SETTLE_MS = 100
+# 等待悬浮球隐藏信号的兜底超时（毫秒），信号未到达时到时直接截图
+FLOAT_BALL_HIDE_TIMEOUT_MS = 250
+# 悬浮球已关闭隐藏动画时，收到隐藏信号后再等待的时间（毫秒），约为两帧，供合成器刷新屏幕
+FLOAT_BALL_SETTLE_MS = 30
+
+# 截图列表中较早的截图以PNG保存的质量参数，Qt中80对应zlib压缩级别1（速度优先）
+STORE_PNG_QUALITY = 80
+
+def _encode_png(image):
+    """
+    将QImage编码为PNG数据，在后台线程中执行
+    
+    参数:
+        image: QImage对象
+        
+    返回:
+        bytes: PNG数据，编码失败时返回None
+    """
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    saved = image.save(buffer, "PNG", STORE_PNG_QUALITY)
+    buffer.close()
+    return bytes(data) if saved else None
+
+class _ScreenshotList:
+    """
+    截图列表
+    只有最新一张截图保留为QPixmap，较早的截图在后台压缩为PNG，访问时再解码，
+    避免整个会话中的全分辨率截图一直占用内存
+    """
+    
+    def __init__(self):
+        """
+        初始化截图列表
+        """
+        self._items = []  # 每项为QPixmap（尚未压缩）或Future（压缩后的PNG数据）
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ScreenshotStore")
+        self._decoded = (None, None)  # 最近一次解码的(索引, QPixmap)，来回切换时无需重复解码
+    
+    def append(self, pixmap):
+        """
+        添加一张截图，并在后台压缩上一张截图
+        
+        参数:
+            pixmap: QPixmap对象
+        """
+        self._release_compressed()
+        if self._items and isinstance(self._items[-1], QPixmap):
+            # QPixmap只能在主线程使用，转换为QImage后交给后台线程编码；
+            # 压缩完成前仍保留原始截图
+            previous = self._items[-1]
+            self._items[-1] = (self._executor.submit(_encode_png, previous.toImage()), previous)
+        self._items.append(pixmap)
+    
+    def _release_compressed(self):
+        """
+        释放已压缩完成的截图的原始QPixmap，压缩失败的截图继续保留原图
+        """
+        for index, item in enumerate(self._items):
+            if isinstance(item, tuple) and item[1] is not None and item[0].done():
+                if item[0].exception() is None and item[0].result() is not None:
+                    self._items[index] = (item[0], None)
+    
+    def __getitem__(self, index):
+        """
+        获取指定位置的截图
+        
+        参数:
+            index: 整数，截图索引
+            
+        返回:
+            QPixmap: 截图
+        """
+        item = self._items[index]
+        if isinstance(item, QPixmap):
+            return item
+        
+        future, pixmap = item
+        if pixmap is not None:
+            # 尚未压缩完成或压缩失败，直接使用原始截图
+            return pixmap
+        
+        index = index % len(self._items)
+        cached_index, cached_pixmap = self._decoded
+        if cached_index == index:
+            return cached_pixmap
+        
+        pixmap = QPixmap()
+        pixmap.loadFromData(future.result(), "PNG")
+        self._decoded = (index, pixmap)
+        return pixmap
+    
+    def __len__(self):
+        """
+        返回截图数量
+        """
+        return len(self._items)
+    
+    def __iter__(self):
+        """
+        依次返回每张截图（较早的截图会逐张解码）
+        """
+        for index in range(len(self._items)):
+            yield self[index]
+    
+    def clear(self):
+        """
+        清除所有截图
+        """
+        self._items.clear()
+        self._decoded = (None, None)
 
 class ScreenshotManager:
     """
@@ -27,18 +142,25 @@ class ScreenshotManager:
             parent: 父对象，通常是主窗口
         """
         self.parent = parent
-        self.screenshots = []  # 存储截图
+        self.screenshots = _ScreenshotList()  # 存储截图，较早的截图压缩保存
         self.full_screen_mode = True  # 默认使用全屏截图模式
+        self._capture_token = None  # 已隐藏窗口、等待延迟截图时的标识，防止重复触发
+        self._grabber = ScreenGrabber()  # 屏幕抓取器，重复使用以避免每次截图重新申请资源
         logger.debug("初始化截图管理器")
     
     def take_fullscreen_screenshot(self):
         """
         捕获全屏截图
+        需要隐藏悬浮球时，等待其隐藏完成后再由事件循环调用_grab_fullscreen，不阻塞界面
         
         返回:
-            bool: 截图成功返回True，否则返回False
+            bool: 截图成功（或已安排截图）返回True，否则返回False
         """
         logger.info("触发全屏截图快捷键")
+        if self._capture_token is not None:
+            logger.debug("上一次截图尚未开始，忽略本次触发")
+            return False
+        
         try:
             if not self.parent.document_manager.word_doc:
                 if not self.parent.is_working_mode:  # 只在非工作模式下显示警告
@@ -46,37 +168,82 @@ class ScreenshotManager:
                     QMessageBox.warning(self.parent, '警告', '请先创建或打开Word文档')
                 return False
             
-            # 如果悬浮球存在且可见，则暂时隐藏
-            float_ball_visible = False
+            # 如果悬浮球存在且可见，则暂时隐藏，收到隐藏信号后再截图
             if self.parent.float_ball and self.parent.float_ball.isVisible():
                 logger.debug("暂时隐藏悬浮球以进行截图")
-                float_ball_visible = True
-                self.parent.float_ball.hide()
-                QApplication.processEvents()
-                time.sleep(0.2)  # 给悬浮球隐藏的时间
+                float_ball = self.parent.float_ball
+                # hidden信号在窗口真正从屏幕上消失前发出，只有确认关闭了隐藏动画时才据此提前截图，
+                # 否则按固定延迟截图
+                callback = lambda: self._grab_fullscreen(True)
+                if float_ball.instant_hide:
+                    self._schedule_capture(callback, FLOAT_BALL_HIDE_TIMEOUT_MS, float_ball.hidden)
+                else:
+                    self._schedule_capture(callback)
+                float_ball.hide()
+                return True
+        except Exception as e:
+            logger.error(f"全屏截图过程中出错: {str(e)}", exc_info=True)
+            if not self.parent.is_working_mode:
+                QMessageBox.critical(self.parent, '错误', f'截图过程中出错: {str(e)}')
+            return False
+        
+        return self._grab_fullscreen(False)
+    
+    def _schedule_capture(self, callback, delay_ms=HIDE_SETTLE_MS, hidden_signal=None):
+        """
+        安排在窗口隐藏后执行截图，需在隐藏窗口之前调用
+        提供隐藏信号时，收到信号后稍等即截图；delay_ms后仍未截图则直接截图
+        
+        参数:
+            callback: 可调用对象，执行截图
+            delay_ms: 整数，最多等待的时间（毫秒）
+            hidden_signal: 窗口隐藏后发出的信号，为None时只按固定延迟截图
+        """
+        token = object()
+        self._capture_token = token
+        
+        def fire():
+            # 隐藏信号和兜底定时器只有先到的一个执行截图
+            if self._capture_token is token:
+                self._capture_token = None
+                callback()
+        
+        if hidden_signal is not None:
+            def on_hidden():
+                hidden_signal.disconnect(on_hidden)
+                QTimer.singleShot(FLOAT_BALL_SETTLE_MS, fire)
+            hidden_signal.connect(on_hidden)
+        QTimer.singleShot(delay_ms, fire)
+    
+    def _grab_fullscreen(self, float_ball_visible):
+        """
+        获取全屏截图并显示截图对话框
+        
+        参数:
+            float_ball_visible: 布尔值，截图前悬浮球是否可见（截图后需要恢复显示）
             
+        返回:
+            bool: 截图成功返回True，否则返回False
+        """
+        try:
             # 获取全屏截图
             logger.debug("开始获取全屏截图")
             try:
-                screen = QApplication.primaryScreen()
-                if screen is None:
-                    logger.error("无法获取主屏幕")
+                pixmap = self.grab_screen()
+                if pixmap is None:
                     raise Exception("无法获取主屏幕")
                     
-                pixmap = screen.grabWindow(0)
                 if pixmap.isNull():
                     logger.error("截图为空")
                     raise Exception("截图为空")
                     
-                logger.info(f"完成全屏截图，尺寸: {pixmap.width()}x{pixmap.height()}")
+                logger.info("完成全屏截图，尺寸: %sx%s", pixmap.width(), pixmap.height())
             except Exception as e:
                 logger.error(f"获取屏幕截图时出错: {str(e)}")
                 # 恢复显示悬浮球（如果之前是可见的）
                 if float_ball_visible and self.parent.float_ball:
                     logger.debug("截图出错，恢复显示悬浮球")
-                    self.parent.float_ball.show()
-                    # 确保悬浮球在最顶层
-                    self.parent.set_window_topmost(self.parent.float_ball)
+                    self._show_float_ball()
                 raise
             
             # 处理截图
@@ -86,27 +253,23 @@ class ScreenshotManager:
             # 恢复显示悬浮球（如果之前是可见的）
             if float_ball_visible and self.parent.float_ball and self.parent.is_working_mode:
                 logger.debug("截图完成，恢复显示悬浮球")
-                self.parent.float_ball.show()
-                # 确保悬浮球在最顶层
-                self.parent.set_window_topmost(self.parent.float_ball)
+                self._show_float_ball()
             
             return result
             
         except Exception as e:
-            logger.error(f"全屏截图过程中出错: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.error(f"全屏截图过程中出错: {str(e)}", exc_info=True)
             if not self.parent.is_working_mode:
                 QMessageBox.critical(self.parent, '错误', f'截图过程中出错: {str(e)}')
             # 确保悬浮球可见（如果在工作模式下）
             if self.parent.is_working_mode and self.parent.float_ball:
-                self.parent.float_ball.show()
-                # 确保悬浮球在最顶层
-                self.parent.set_window_topmost(self.parent.float_ball)
+                self._show_float_ball()
             return False
     
     def start_area_capture(self, force_area=False, auto_save=False):
         """
         开始区域截图
+        隐藏窗口后由事件循环延迟创建截图窗口，不阻塞界面
         
         参数:
             force_area: 布尔值，是否强制使用区域截图模式
@@ -115,7 +278,11 @@ class ScreenshotManager:
         返回:
             bool: 成功返回True，否则返回False
         """
-        logger.debug(f"开始区域截图，强制区域模式: {force_area}, 自动保存模式: {auto_save}")
+        logger.debug("开始区域截图，强制区域模式: %s, 自动保存模式: %s", force_area, auto_save)
+        if self._capture_token is not None:
+            logger.debug("上一次截图尚未开始，忽略本次触发")
+            return False
+        
         try:
             if not self.parent.document_manager.word_doc:
                 if not self.parent.is_working_mode:  # 只在非工作模式下显示警告
@@ -140,13 +307,25 @@ class ScreenshotManager:
                 logger.debug("暂时隐藏悬浮球以进行区域截图")
                 self.parent.float_ball.hide()
             
-            # 处理事件，确保窗口状态更新
-            QApplication.processEvents()
-            time.sleep(0.2)  # 给窗口隐藏的时间
-            
+            # 等待窗口隐藏完成后再创建截图窗口（截图窗口创建时即抓取屏幕）
+            self._schedule_capture(lambda: self._show_capture_window(auto_save))
+            return True
+        except Exception as e:
+            logger.error(f"开始区域截图时出错: {str(e)}", exc_info=True)
+            self._restore_after_area_capture_error()
+            return False
+    
+    def _show_capture_window(self, auto_save):
+        """
+        创建并显示区域截图窗口
+        
+        参数:
+            auto_save: 布尔值，是否自动保存截图（不显示对话框）
+        """
+        try:
             # 创建区域截图窗口
             logger.debug("创建区域截图窗口")
-            self.capture_window = CaptureWindow(self.parent)
+            self.capture_window = CaptureWindow(self.parent, self.grab_screen())
             
             # 设置自动保存模式
             if auto_save:
@@ -155,23 +334,40 @@ class ScreenshotManager:
             
             # 显示区域截图窗口
             self.capture_window.showFullScreen()
-            
-            return True
         except Exception as e:
-            logger.error(f"开始区域截图时出错: {str(e)}")
-            logger.error(traceback.format_exc())
-            
-            # 恢复窗口显示
-            if self.parent.is_working_mode and self.parent.float_ball:
-                logger.debug("截图出错，恢复显示悬浮球")
-                self.parent.float_ball.show()
-                # 确保悬浮球在最顶层
-                self.parent.set_window_topmost(self.parent.float_ball)
-            else:
-                logger.debug("截图出错，恢复显示主窗口")
-                self.parent.show()
-            
-            return False
+            logger.error(f"开始区域截图时出错: {str(e)}", exc_info=True)
+            self._restore_after_area_capture_error()
+    
+    def grab_screen(self):
+        """
+        抓取主屏幕
+        
+        返回:
+            QPixmap: 主屏幕截图，无法获取主屏幕时返回None
+        """
+        return self._grabber.grab()
+    
+    def _show_float_ball(self):
+        """
+        显示悬浮球并置顶
+        截图流程中多处都会恢复悬浮球，已经显示时不再重复显示和置顶
+        """
+        float_ball = self.parent.float_ball
+        if float_ball and not float_ball.isVisible():
+            float_ball.show()
+            # 确保悬浮球在最顶层
+            self.parent.set_window_topmost(float_ball)
+    
+    def _restore_after_area_capture_error(self):
+        """
+        区域截图出错时恢复窗口显示
+        """
+        if self.parent.is_working_mode and self.parent.float_ball:
+            logger.debug("截图出错，恢复显示悬浮球")
+            self._show_float_ball()
+        else:
+            logger.debug("截图出错，恢复显示主窗口")
+            self.parent.show()
     
     def process_screenshot_with_dialog(self, pixmap):
         """
@@ -210,48 +406,33 @@ class ScreenshotManager:
                 # 显示对话框
                 try:
                     result = dialog.exec_()
-                    logger.debug(f"对话框结果: {result}, 保存状态: {dialog.save_screenshot}")
+                    logger.debug("对话框结果: %s, 保存状态: %s", result, dialog.save_screenshot)
                 except Exception as e:
-                    logger.error(f"显示对话框时出错: {str(e)}")
-                    logger.error(traceback.format_exc())
+                    logger.error(f"显示对话框时出错: {str(e)}", exc_info=True)
                     # 恢复显示悬浮球（如果之前是可见的）
                     if float_ball_visible and self.parent.float_ball and self.parent.is_working_mode:
                         logger.debug("对话框出错，恢复显示悬浮球")
-                        self.parent.float_ball.show()
-                        # 确保悬浮球在最顶层
-                        self.parent.set_window_topmost(self.parent.float_ball)
+                        self._show_float_ball()
                     return False
                 
                 # 恢复显示悬浮球（如果之前是可见的）
                 if float_ball_visible and self.parent.float_ball and self.parent.is_working_mode:
                     logger.debug("对话框关闭，恢复显示悬浮球")
-                    self.parent.float_ball.show()
-                    # 确保悬浮球在最顶层
-                    self.parent.set_window_topmost(self.parent.float_ball)
+                    self._show_float_ball()
                 
                 if result == QDialog.Accepted and dialog.save_screenshot:
                     logger.debug("用户选择保存截图")
                     # 保存截图
                     old_count = len(self.screenshots)
                     self.screenshots.append(pixmap)
-                    logger.debug(f"截图已添加到列表，数量: {old_count} -> {len(self.screenshots)}")
-                    
-                    # 显示最新截图的预览，并更新当前索引
-                    logger.debug(f"调用show_preview更新预览，当前索引: {self.parent.current_screenshot_index}")
-                    self.parent.show_preview(pixmap, update_index=True)
-                    logger.debug(f"预览更新完成，更新后索引: {self.parent.current_screenshot_index}")
-                    
-                    # 更新状态和计数
-                    self.parent.screenshot_count.setText(str(len(self.screenshots)))
-                    self.parent.status_label.setText(f'已截取 {len(self.screenshots)} 张图片')
+                    logger.debug("截图已添加到列表，数量: %s -> %s", old_count, len(self.screenshots))
                     
                     # 自动添加到Word文档，包括文本说明
-                    logger.debug(f"添加截图到Word文档，文本说明长度: {len(dialog.text)}")
+                    logger.debug("添加截图到Word文档，文本说明长度: %s", len(dialog.text))
                     success = self.parent.document_manager.add_screenshot(pixmap, dialog.text)
                     
-                    # 启用按钮
-                    self.parent.save_doc_btn.setEnabled(True)
-                    self.parent.clear_btn.setEnabled(True)
+                    # 更新预览、计数、状态和按钮
+                    self._commit_ui_state(pixmap, f'已截取 {len(self.screenshots)} 张图片')
                     
                     # 如果在工作模式下，显示一个简短的通知
                     if self.parent.is_working_mode:
@@ -266,9 +447,7 @@ class ScreenshotManager:
                         # 在工作模式下，始终显示悬浮球
                         logger.debug("截图保存完成，在工作模式下显示悬浮球")
                         if self.parent.float_ball:
-                            self.parent.float_ball.show()
-                            # 确保悬浮球置顶
-                            self.parent.set_window_topmost(self.parent.float_ball)
+                            self._show_float_ball()
                         # 隐藏主窗口
                         self.parent.hide()
                     else:
@@ -285,9 +464,7 @@ class ScreenshotManager:
                         # 在工作模式下，始终显示悬浮球
                         logger.debug("截图取消保存，在工作模式下显示悬浮球")
                         if self.parent.float_ball:
-                            self.parent.float_ball.show()
-                            # 确保悬浮球置顶
-                            self.parent.set_window_topmost(self.parent.float_ball)
+                            self._show_float_ball()
                         # 隐藏主窗口
                         self.parent.hide()
                     else:
@@ -301,8 +478,7 @@ class ScreenshotManager:
                 logger.warning("截图无效，无法处理")
                 return False
         except Exception as e:
-            logger.error(f"处理截图时出错: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.error(f"处理截图时出错: {str(e)}", exc_info=True)
             return False
     
     def process_screenshot_auto_save(self, pixmap):
@@ -332,128 +508,90 @@ class ScreenshotManager:
                 
             logger.debug("截图有效，准备自动保存")
             
-            # 检查父窗口
-            if not self.parent:
-                logger.error("父窗口对象为None，无法自动保存")
-                return False
-                
             # 生成当前时间作为默认说明文字
-            try:
-                current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                default_text = f"自动保存的截图 - {current_time}"
-                logger.debug(f"生成默认说明文字: {default_text}")
-            except Exception as e:
-                logger.error(f"生成默认说明文字时出错: {str(e)}")
-                default_text = "自动保存的截图"
+            current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            default_text = f"自动保存的截图 - {current_time}"
+            logger.debug("生成默认说明文字: %s", default_text)
             
             # 保存截图
-            try:
-                old_count = len(self.screenshots)
-                self.screenshots.append(pixmap)
-                logger.debug(f"截图已添加到列表，数量: {old_count} -> {len(self.screenshots)}")
-            except Exception as e:
-                logger.error(f"添加截图到列表时出错: {str(e)}")
-                logger.error(traceback.format_exc())
-                return False
-            
-            # 显示最新截图的预览，并更新当前索引
-            try:
-                logger.debug(f"调用show_preview更新预览，当前索引: {self.parent.current_screenshot_index}")
-                self.parent.show_preview(pixmap, update_index=True)
-                logger.debug(f"预览更新完成，更新后索引: {self.parent.current_screenshot_index}")
-            except Exception as e:
-                logger.error(f"更新预览时出错: {str(e)}")
-                logger.error(traceback.format_exc())
-                # 继续执行，不要因为预览问题而中断
-            
-            # 更新状态和计数
-            try:
-                self.parent.screenshot_count.setText(str(len(self.screenshots)))
-                self.parent.status_label.setText(f'已自动保存 {len(self.screenshots)} 张图片')
-            except Exception as e:
-                logger.error(f"更新状态和计数时出错: {str(e)}")
-                logger.error(traceback.format_exc())
-                # 继续执行，不要因为UI更新问题而中断
+            old_count = len(self.screenshots)
+            self.screenshots.append(pixmap)
+            logger.debug("截图已添加到列表，数量: %s -> %s", old_count, len(self.screenshots))
             
-            # 自动添加到Word文档，包括默认文本说明
+            # 先添加到Word文档，界面更新出错时截图也不会丢失
             try:
-                logger.debug(f"添加截图到Word文档，使用默认文本说明")
+                logger.debug("添加截图到Word文档，使用默认文本说明")
                 success = self.parent.document_manager.add_screenshot(pixmap, default_text)
                 if not success:
                     logger.warning("添加截图到Word文档失败")
             except Exception as e:
-                logger.error(f"添加截图到Word文档时出错: {str(e)}")
-                logger.error(traceback.format_exc())
+                logger.error(f"添加截图到Word文档时出错: {str(e)}", exc_info=True)
                 # 继续执行，不要因为文档问题而中断
             
-            # 启用按钮
-            try:
-                self.parent.save_doc_btn.setEnabled(True)
-                self.parent.clear_btn.setEnabled(True)
-            except Exception as e:
-                logger.error(f"启用按钮时出错: {str(e)}")
-                logger.error(traceback.format_exc())
-                # 继续执行，不要因为UI更新问题而中断
+            # 更新预览、计数、状态和按钮
+            self._commit_ui_state(pixmap, f'已自动保存 {len(self.screenshots)} 张图片')
             
             # 显示一个简短的通知
-            try:
-                if hasattr(self.parent, 'tray_icon') and self.parent.tray_icon:
-                    self.parent.tray_icon.showMessage("截图已自动保存", "截图已成功添加到Word文档", QSystemTrayIcon.Information, 2000)
-                    logger.debug("显示托盘通知：截图已自动保存")
-            except Exception as e:
-                logger.error(f"显示托盘通知时出错: {str(e)}")
-                logger.error(traceback.format_exc())
-                # 继续执行，不要因为通知问题而中断
+            if self.parent.tray_icon:
+                self.parent.tray_icon.showMessage("截图已自动保存", "截图已成功添加到Word文档", QSystemTrayIcon.Information, 2000)
+                logger.debug("显示托盘通知：截图已自动保存")
             
             # 处理窗口显示状态
-            try:
-                if hasattr(self.parent, 'is_working_mode') and self.parent.is_working_mode:
-                    # 在工作模式下，始终显示悬浮球
-                    logger.debug("截图自动保存完成，在工作模式下显示悬浮球")
-                    if hasattr(self.parent, 'float_ball') and self.parent.float_ball:
-                        try:
-                            self.parent.float_ball.show()
-                            # 确保悬浮球置顶
-                            if hasattr(self.parent, 'set_window_topmost'):
-                                self.parent.set_window_topmost(self.parent.float_ball)
-                            # 在悬浮球上显示成功提示
-                            if hasattr(self.parent.float_ball, 'show_success_tip'):
-                                try:
-                                    self.parent.float_ball.show_success_tip(f"第 {len(self.screenshots)} 张截图已保存")
-                                except Exception as e:
-                                    logger.error(f"显示悬浮球成功提示时出错: {str(e)}")
-                                    logger.error(traceback.format_exc())
-                        except Exception as e:
-                            logger.error(f"显示悬浮球时出错: {str(e)}")
-                            logger.error(traceback.format_exc())
-                    # 隐藏主窗口
-                    if hasattr(self.parent, 'hide'):
-                        self.parent.hide()
-                else:
-                    # 非工作模式下，显示主窗口
-                    logger.debug("截图自动保存完成，在非工作模式下显示主窗口")
-                    if hasattr(self.parent, 'show'):
-                        self.parent.show()
-                    if hasattr(self.parent, 'activateWindow'):
-                        self.parent.activateWindow()
-            except Exception as e:
-                logger.error(f"处理窗口显示状态时出错: {str(e)}")
-                logger.error(traceback.format_exc())
-                # 继续执行，不要因为窗口状态问题而中断
+            if self.parent.is_working_mode:
+                # 在工作模式下，始终显示悬浮球
+                logger.debug("截图自动保存完成，在工作模式下显示悬浮球")
+                if self.parent.float_ball:
+                    self._show_float_ball()
+                    # 在悬浮球上显示成功提示
+                    self.parent.float_ball.show_success_tip(f"第 {len(self.screenshots)} 张截图已保存")
+                # 隐藏主窗口
+                self.parent.hide()
+            else:
+                # 非工作模式下，显示主窗口
+                logger.debug("截图自动保存完成，在非工作模式下显示主窗口")
+                self.parent.show()
+                self.parent.activateWindow()
             
             logger.debug("自动保存截图完成")
             return True
         except Exception as e:
-            logger.error(f"自动保存截图时出错: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.error(f"自动保存截图时出错: {str(e)}", exc_info=True)
             return False
     
+    def _commit_ui_state(self, pixmap, status_text):
+        """
+        截图保存后一次性更新主窗口的预览、计数、状态和按钮
+        更新期间暂停主窗口重绘，所有控件的变化合并为一次重绘
+        
+        参数:
+            pixmap: QPixmap对象，最新的截图
+            status_text: 字符串，状态栏文本
+        """
+        self.parent.setUpdatesEnabled(False)
+        try:
+            # 显示最新截图的预览，并更新当前索引
+            logger.debug("调用show_preview更新预览，当前索引: %s", self.parent.current_screenshot_index)
+            self.parent.show_preview(pixmap, update_index=True, background=True)
+            logger.debug("预览更新完成，更新后索引: %s", self.parent.current_screenshot_index)
+            
+            # 更新状态和计数
+            self.parent.screenshot_count.setText(str(len(self.screenshots)))
+            self.parent.status_label.setText(status_text)
+            
+            # 启用按钮
+            self.parent.save_doc_btn.setEnabled(True)
+            self.parent.clear_btn.setEnabled(True)
+        finally:
+            self.parent.setUpdatesEnabled(True)
+            self.parent.update()
+    
     def clear_screenshots(self):
         """
         清除所有截图
         """
-        logger.debug(f"开始清除截图，当前数量: {len(self.screenshots)}, 当前索引: {self.parent.current_screenshot_index}")
+        logger.debug("开始清除截图，当前数量: %s, 当前索引: %s", len(self.screenshots), self.parent.current_screenshot_index)
         self.screenshots.clear()
+        self.parent.preview_token += 1  # 丢弃尚未完成的后台预览缩放
         self.parent.preview_label.clear()
         self.parent.preview_label.setText('截图预览区域')
         self.parent.screenshot_count.setText('0')
@@ -13,6 +13,10 @@ from PyQt5.QtCore import Qt
 from src.ui.main_window import MainWindow
 from src.utils.logger import setup_logger, logger
 
+# 应用程序根目录及临时截图文件夹路径
+APP_ROOT_DIR = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
+TEMP_SCREENSHOTS_DIR = os.path.join(APP_ROOT_DIR, 'temp_screenshots')
+
 def cleanup():
     """
     程序退出时的清理函数
@@ -23,9 +27,7 @@ def cleanup():
         # 清理临时截图文件夹
         try:
             import shutil
-            app_dir = os.path.abspath(os.path.dirname(__file__))
-            app_root_dir = os.path.dirname(app_dir)
-            temp_dir = os.path.join(app_root_dir, 'temp_screenshots')
+            temp_dir = TEMP_SCREENSHOTS_DIR
             
             if os.path.exists(temp_dir) and os.path.isdir(temp_dir):
                 logger.info(f"清理临时截图文件夹: {temp_dir}")
@@ -66,10 +68,7 @@ def log_temp_screenshots_path():
     记录temp_screenshots文件夹的路径到日志
     """
     try:
-        # 获取应用程序目录
-        app_dir = os.path.abspath(os.path.dirname(__file__))
-        app_root_dir = os.path.dirname(app_dir)
-        temp_dir = os.path.join(app_root_dir, 'temp_screenshots')
+        temp_dir = TEMP_SCREENSHOTS_DIR
         
         # 记录路径到日志
         logger.info("=" * 50)
@@ -78,7 +77,8 @@ def log_temp_screenshots_path():
         
         # 检查文件夹是否存在
         if os.path.exists(temp_dir):
-            file_count = len([f for f in os.listdir(temp_dir) if os.path.isfile(os.path.join(temp_dir, f))])
+            with os.scandir(temp_dir) as entries:
+                file_count = sum(1 for entry in entries if entry.is_file())
             logger.info(f"临时截图文件夹已存在，包含 {file_count} 个文件")
         else:
             logger.info("临时截图文件夹尚未创建")
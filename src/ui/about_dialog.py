@@ -8,6 +8,7 @@ from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                             QPushButton, QFrame)
 from PyQt5.QtCore import Qt
 from src.utils.logger import logger
+from src import __version__
 
 class AboutDialog(QDialog):
     """
@@ -54,7 +55,7 @@ class AboutDialog(QDialog):
             title_label.setAlignment(Qt.AlignCenter)
             
             # 版本
-            version_label = QLabel('版本 1.0.4')
+            version_label = QLabel(f'版本 {__version__}')
             version_label.setStyleSheet("font-size: 14px; color: #555;")
             version_label.setAlignment(Qt.AlignCenter)
             
@@ -15,20 +15,23 @@ class CaptureWindow(QWidget):
     用于实现区域截图功能，允许用户通过鼠标选择截图区域
     """
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, screenshot=None):
         """
         初始化截图窗口
         
         参数:
             parent: 父窗口，通常是主窗口
+            screenshot: QPixmap对象，已抓取的全屏截图，为None时在此抓取
         """
         super().__init__()
         logger.debug("初始化截图窗口")
         self.parent_window = parent
         
         # 获取全屏截图
-        self.screenshot = QApplication.primaryScreen().grabWindow(0)
-        logger.debug(f"获取全屏截图，尺寸: {self.screenshot.width()}x{self.screenshot.height()}")
+        if screenshot is None:
+            screenshot = QApplication.primaryScreen().grabWindow(0)
+        self.screenshot = screenshot
+        logger.debug("获取全屏截图，尺寸: %sx%s", self.screenshot.width(), self.screenshot.height())
         
         self.setWindowFlags(Qt.FramelessWindowHint)
         self.setStyleSheet("background-color:transparent;")
@@ -179,7 +182,7 @@ class CaptureWindow(QWidget):
             return
         
         # 从全屏截图中裁剪选择区域
-        logger.debug(f"裁剪选择区域: {rect.x()}, {rect.y()}, {rect.width()} x {rect.height()}")
+        logger.debug("裁剪选择区域: %s, %s, %s x %s", rect.x(), rect.y(), rect.width(), rect.height())
         cropped_pixmap = self.screenshot.copy(rect)
         
         # 关闭截图窗口
@@ -7,7 +7,7 @@ import traceback
 import time
 import ctypes
 from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QMenu, QAction, QApplication
-from PyQt5.QtCore import Qt, QPoint, QTimer, QSize, QMetaObject, Q_ARG
+from PyQt5.QtCore import Qt, QPoint, QTimer, QSize, QMetaObject, Q_ARG, pyqtSignal
 from PyQt5.QtGui import QPixmap, QPainter, QColor, QCursor
 from src.utils.logger import logger
 
@@ -18,6 +18,7 @@ SWP_NOMOVE = 0x0002
 SWP_NOSIZE = 0x0001
 SWP_NOACTIVATE = 0x0010
 SWP_SHOWWINDOW = 0x0040
+DWMWA_TRANSITIONS_FORCEDISABLED = 3
 
 class FloatBall(QWidget):
     """
@@ -25,6 +26,9 @@ class FloatBall(QWidget):
     在工作模式下显示一个可拖动的小图标，点击可触发截图
     """
     
+    # 窗口隐藏后发出，截图时据此尽快开始抓取屏幕
+    hidden = pyqtSignal()
+    
     def __init__(self, parent=None):
         """
         初始化悬浮球窗口
@@ -37,6 +41,8 @@ class FloatBall(QWidget):
         
         self.parent_window = parent
         self.dragging = False
+        self._transitions_hwnd = None  # 已尝试关闭显示/隐藏动画的窗口句柄，setWindowFlags重建窗口后句柄会变化
+        self.instant_hide = False  # 当前窗口是否确认已关闭隐藏动画，为True时隐藏后悬浮球立即从屏幕上消失
         self.offset = QPoint()
         
         # 双击检测
@@ -123,12 +129,52 @@ class FloatBall(QWidget):
             event: 事件对象
         """
         super().showEvent(event)
+        # setWindowFlags（如safe_resize）会重建原生窗口，新窗口需要重新关闭动画
+        if self._transitions_hwnd != int(self.winId()):
+            self.disable_transitions()
         # 确保窗口在最顶层
         self.ensure_topmost()
         # 立即再次确保置顶，防止其他应用抢占
         QTimer.singleShot(100, self.ensure_topmost)
         QTimer.singleShot(500, self.ensure_topmost)
     
+    def hideEvent(self, event):
+        """
+        窗口隐藏事件处理
+        hidden信号在Qt处理隐藏时同步发出，此时合成器可能尚未从屏幕上移除窗口（或仍在播放淡出动画），
+        只有instant_hide为True时才可在收到信号后短暂等待即截图
+        
+        参数:
+            event: 事件对象
+        """
+        super().hideEvent(event)
+        self.hidden.emit()
+    
+    def disable_transitions(self):
+        """
+        关闭系统的窗口显示/隐藏动画（Windows DWM）
+        隐藏后悬浮球立即从屏幕上消失，截图前无需等待动画结束
+        """
+        # 设置成功前不认为隐藏是立即完成的
+        self.instant_hide = False
+        try:
+            hwnd = int(self.winId())
+            self._transitions_hwnd = hwnd
+            value = ctypes.c_int(1)
+            result = ctypes.windll.dwmapi.DwmSetWindowAttribute(
+                hwnd,
+                DWMWA_TRANSITIONS_FORCEDISABLED,
+                ctypes.byref(value),
+                ctypes.sizeof(value)
+            )
+            # 返回S_OK（0）才说明动画已关闭
+            self.instant_hide = result == 0
+            if not self.instant_hide:
+                logger.debug("关闭悬浮球窗口动画失败，返回值: %s", result)
+        except Exception as e:
+            # 非Windows平台或未启用DWM
+            logger.debug("关闭悬浮球窗口动画失败: %s", e)
+    
     def ensure_topmost(self):
         """
         确保窗口始终在最顶层
@@ -366,8 +412,8 @@ class FloatBall(QWidget):
                     logger.error(f"简化消息格式时出错: {str(e)}")
                     message = "saved"  # 默认简化消息
             
-            logger.debug(f"开始显示悬浮球成功提示: '{message}'")
-            logger.debug(f"当前悬浮球状态: 可见={self.isVisible()}, 大小={self.size().width()}x{self.size().height()}")
+            logger.debug("开始显示悬浮球成功提示: '%s'", message)
+            logger.debug("当前悬浮球状态: 可见=%s, 大小=%sx%s", self.isVisible(), self.size().width(), self.size().height())
             
             # 检查组件是否存在
             if not hasattr(self, 'icon_label'):
@@ -378,7 +424,7 @@ class FloatBall(QWidget):
                 logger.error("悬浮球图标标签为None，无法显示提示")
                 return
                 
-            logger.debug(f"icon_label状态: 可见={self.icon_label.isVisible()}, 大小={self.icon_label.size().width()}x{self.icon_label.size().height()}")
+            logger.debug("icon_label状态: 可见=%s, 大小=%sx%s", self.icon_label.isVisible(), self.icon_label.size().width(), self.icon_label.size().height())
             
             # 先保存原始状态，确保在恢复时有正确的值
             try:
@@ -386,7 +432,7 @@ class FloatBall(QWidget):
                 
                 # 保存原始样式表
                 self.original_style = self.icon_label.styleSheet()
-                logger.debug(f"已保存原始样式表: {self.original_style[:50]}...")  # 只记录前50个字符
+                logger.debug("已保存原始样式表: %s...", self.original_style[:50])  # 只记录前50个字符
                 
                 # 保存原始图像
                 original_pixmap = self.icon_label.pixmap()
@@ -399,11 +445,11 @@ class FloatBall(QWidget):
                 else:
                     # 创建深拷贝
                     self.original_pixmap = QPixmap(original_pixmap)
-                    logger.debug(f"已保存原始图像，尺寸: {self.original_pixmap.width()}x{self.original_pixmap.height()}")
+                    logger.debug("已保存原始图像，尺寸: %sx%s", self.original_pixmap.width(), self.original_pixmap.height())
                 
                 # 保存原始大小
                 self.original_size = QSize(self.size())
-                logger.debug(f"已保存原始大小: {self.original_size.width()}x{self.original_size.height()}")
+                logger.debug("已保存原始大小: %sx%s", self.original_size.width(), self.original_size.height())
             except Exception as e:
                 logger.error(f"保存原始样式时出错: {str(e)}")
                 logger.error(traceback.format_exc())
@@ -446,7 +492,7 @@ class FloatBall(QWidget):
                 painter.drawRoundedRect(success_pixmap.rect(), 15, 15)  # 减小圆角半径
                 
                 # 绘制文字 - 使用更小的字体
-                logger.debug(f"绘制文字: '{message}'")
+                logger.debug("绘制文字: '%s'", message)
                 painter.setPen(Qt.white)
                 font = self.font()
                 font.setPointSize(12)  # 减小字体大小
@@ -462,13 +508,13 @@ class FloatBall(QWidget):
             
             # 临时调整窗口大小以适应提示
             try:
-                logger.debug(f"调整窗口大小为: {success_pixmap.width()}x{success_pixmap.height()}")
+                logger.debug("调整窗口大小为: %sx%s", success_pixmap.width(), success_pixmap.height())
                 
                 # 先调整icon_label大小
                 if hasattr(self, 'icon_label') and self.icon_label:
                     self.icon_label.setMinimumSize(success_pixmap.width(), success_pixmap.height())
                     self.icon_label.setMaximumSize(success_pixmap.width(), success_pixmap.height())
-                    logger.debug(f"已调整icon_label大小为: {success_pixmap.width()}x{success_pixmap.height()}")
+                    logger.debug("已调整icon_label大小为: %sx%s", success_pixmap.width(), success_pixmap.height())
                 
                 # 然后调整窗口大小
                 self.safe_resize(success_pixmap.width(), success_pixmap.height())
@@ -618,7 +664,7 @@ class FloatBall(QWidget):
                     # 恢复大小
                     if hasattr(self, 'original_size'):
                         self.safe_resize(self.original_size.width(), self.original_size.height())
-                        logger.debug(f"恢复原始大小成功: {self.original_size.width()}x{self.original_size.height()}")
+                        logger.debug("恢复原始大小成功: %sx%s", self.original_size.width(), self.original_size.height())
                 except Exception as ex:
                     logger.error(f"使用保存的原始状态恢复时出错: {str(ex)}")
                     logger.error(traceback.format_exc())
@@ -653,18 +699,18 @@ class FloatBall(QWidget):
                 logger.warning("窗口已不可见，跳过调整大小")
                 return
                 
-            logger.debug(f"尝试调整窗口大小为: {width}x{height}")
-            logger.debug(f"当前窗口状态: 可见={self.isVisible()}, 大小={self.size().width()}x{self.size().height()}, 标志={self.windowFlags()}")
+            logger.debug("尝试调整窗口大小为: %sx%s", width, height)
+            logger.debug("当前窗口状态: 可见=%s, 大小=%sx%s, 标志=%s", self.isVisible(), self.size().width(), self.size().height(), self.windowFlags())
             
             # 保存当前窗口状态
             current_flags = self.windowFlags()
             current_geometry = self.geometry()
-            logger.debug(f"保存当前窗口状态 - 位置: ({current_geometry.x()}, {current_geometry.y()}), 大小: {current_geometry.width()}x{current_geometry.height()}")
+            logger.debug("保存当前窗口状态 - 位置: (%s, %s), 大小: %sx%s", current_geometry.x(), current_geometry.y(), current_geometry.width(), current_geometry.height())
             
             # 临时移除 Qt.Tool 标志，防止调整大小时窗口关闭
             new_flags = current_flags & ~Qt.Tool
             if new_flags != current_flags:
-                logger.debug(f"移除Qt.Tool标志: {new_flags}")
+                logger.debug("移除Qt.Tool标志: %s", new_flags)
                 self.setWindowFlags(new_flags)
                 
                 # 确保窗口仍然可见
@@ -679,7 +725,7 @@ class FloatBall(QWidget):
             
             # 使用resize调整大小
             self.resize(width, height)
-            logger.debug(f"resize后的窗口大小: {self.size().width()}x{self.size().height()}")
+            logger.debug("resize后的窗口大小: %sx%s", self.size().width(), self.size().height())
             
             # 等待处理事件，让resize生效
             QApplication.processEvents()
@@ -687,16 +733,16 @@ class FloatBall(QWidget):
             
             # 使用setFixedSize固定大小
             self.setFixedSize(width, height)
-            logger.debug(f"setFixedSize后的窗口大小: {self.size().width()}x{self.size().height()}")
+            logger.debug("setFixedSize后的窗口大小: %sx%s", self.size().width(), self.size().height())
             
             # 恢复原始窗口标志
             if new_flags != current_flags:
-                logger.debug(f"恢复原始窗口标志: {current_flags}")
+                logger.debug("恢复原始窗口标志: %s", current_flags)
                 self.setWindowFlags(current_flags)
                 
                 # 恢复窗口位置
                 self.setGeometry(current_geometry.x(), current_geometry.y(), width, height)
-                logger.debug(f"恢复窗口位置: ({current_geometry.x()}, {current_geometry.y()})")
+                logger.debug("恢复窗口位置: (%s, %s)", current_geometry.x(), current_geometry.y())
                 
                 # 重新显示窗口
                 self.show()
@@ -708,7 +754,7 @@ class FloatBall(QWidget):
             
             # 记录实际调整后的大小
             final_size = self.size()
-            logger.debug(f"调整后的最终大小: {final_size.width()}x{final_size.height()}")
+            logger.debug("调整后的最终大小: %sx%s", final_size.width(), final_size.height())
             
             # 如果调整失败，记录警告
             if final_size.width() != width or final_size.height() != height:
@@ -115,7 +115,7 @@ class FullscreenImageViewer(QDialog):
             # 设置图片
             self.image_label.setPixmap(scaled_pixmap)
             
-            logger.debug(f"图片已缩放显示，原始尺寸: {self.pixmap.width()}x{self.pixmap.height()}, 缩放后尺寸: {scaled_pixmap.width()}x{scaled_pixmap.height()}")
+            logger.debug("图片已缩放显示，原始尺寸: %sx%s, 缩放后尺寸: %sx%s", self.pixmap.width(), self.pixmap.height(), scaled_pixmap.width(), scaled_pixmap.height())
         except Exception as e:
             logger.error(f"更新图片显示时出错: {str(e)}")
             logger.error(traceback.format_exc())
@@ -4,15 +4,17 @@
 """
 
 import os
+import logging
 import traceback
 import datetime
 import ctypes
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5.QtWidgets import (QMainWindow, QPushButton, QVBoxLayout, 
                             QHBoxLayout, QWidget, QLabel, QMessageBox,
                             QShortcut, QCheckBox, QSystemTrayIcon, QMenu, QAction,
                             QStyle, QFrame, QApplication)
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QEvent
-from PyQt5.QtGui import QKeySequence, QPixmap
+from PyQt5.QtGui import QKeySequence, QPixmap, QImage
 from src.utils.logger import logger
 from src.utils.event_filter import GlobalEventFilter
 from src.utils.hotkey_manager import HotkeyManager
@@ -41,6 +43,7 @@ class MainWindow(QMainWindow):
     area_signal = pyqtSignal()
     esc_signal = pyqtSignal()
     auto_save_signal = pyqtSignal()  # 添加自动保存信号
+    preview_ready_signal = pyqtSignal(int, QImage)  # 后台缩放的预览图像完成信号
     
     def __init__(self):
         """
@@ -55,6 +58,8 @@ class MainWindow(QMainWindow):
         self.is_working_mode = False  # 是否处于工作模式
         self.float_ball = None  # 悬浮球窗口
         self.current_screenshot_index = -1  # 当前显示的截图索引，-1表示没有显示任何截图
+        self.preview_token = 0  # 预览请求序号，每次更新或清除预览时递增，用于丢弃过期的后台缩放结果
+        self._preview_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="PreviewScale")
         
         # 初始化管理器
         self.document_manager = DocumentManager(self)
@@ -72,6 +77,9 @@ class MainWindow(QMainWindow):
         
         # 设置全局事件过滤器
         self.event_filter = GlobalEventFilter(self)
+        
+        # 后台缩放的预览图像回到GUI线程后再显示
+        self.preview_ready_signal.connect(self._on_preview_ready)
         QApplication.instance().installEventFilter(self.event_filter)
         logger.info("已安装全局事件过滤器")
         
@@ -117,7 +125,7 @@ class MainWindow(QMainWindow):
             signal_type: 字符串，信号类型
         """
         try:
-            logger.debug(f"准备发射 {signal_type} 信号")
+            logger.debug("准备发射 %s 信号", signal_type)
             if signal_type == "fullscreen":
                 logger.debug("发射全屏截图信号")
                 self.fullscreen_signal.emit()
@@ -134,7 +142,7 @@ class MainWindow(QMainWindow):
                 logger.debug("发射自动保存截图信号")
                 self.auto_save_signal.emit()
                 # 不再使用备份机制，避免双重触发
-            logger.debug(f"{signal_type} 信号已发射")
+            logger.debug("%s 信号已发射", signal_type)
         except Exception as e:
             logger.error(f"发射 {signal_type} 信号时出错: {str(e)}")
             logger.error(traceback.format_exc())
@@ -619,7 +627,7 @@ class MainWindow(QMainWindow):
         self.screenshot_manager.full_screen_mode = (state == Qt.Checked)
         mode_text = "全屏截图模式" if self.screenshot_manager.full_screen_mode else "区域截图模式"
         self.status_label.setText(f'当前模式: {mode_text}')
-        logger.debug(f"切换截图模式为: {mode_text}")
+        logger.debug("切换截图模式为: %s", mode_text)
     
     def toggle_topmost(self):
         """
@@ -785,15 +793,16 @@ class MainWindow(QMainWindow):
         """
         self.screenshot_manager.process_screenshot_with_dialog(pixmap)
     
-    def show_preview(self, pixmap, update_index=False):
+    def show_preview(self, pixmap, update_index=False, background=False):
         """
         在预览区域显示截图
         
         参数:
             pixmap: QPixmap对象，要显示的截图
             update_index: 布尔值，是否更新当前截图索引
+            background: 布尔值，是否在后台线程中缩放，缩放完成后再显示
         """
-        logger.debug(f"开始更新预览，原始图像尺寸: {pixmap.width()}x{pixmap.height()}, 预览区域尺寸: {self.preview_label.width()}x{self.preview_label.height()}")
+        logger.debug("开始更新预览，原始图像尺寸: %sx%s, 预览区域尺寸: %sx%s", pixmap.width(), pixmap.height(), self.preview_label.width(), self.preview_label.height())
         
         # 保存当前预览区域的大小
         current_width = self.preview_label.width()
@@ -804,29 +813,37 @@ class MainWindow(QMainWindow):
             self.preview_label.setMinimumHeight(300)
             self.preview_label.setMinimumWidth(400)  # 设置一个合理的最小宽度
         
-        # 调整图像大小以适应预览区域
-        preview_pixmap = pixmap.scaled(
-            current_width, 
-            current_height,
-            Qt.KeepAspectRatio, 
-            Qt.SmoothTransformation
-        )
-        
-        logger.debug(f"缩放后的预览图像尺寸: {preview_pixmap.width()}x{preview_pixmap.height()}")
-        
         # 检查预览标签是否有效
         if self.preview_label is None:
             logger.error("预览标签对象为None")
             return
+        
+        # 新的预览请求使尚未完成的后台缩放结果失效
+        self.preview_token += 1
+        
+        if background:
+            # 平滑缩放全分辨率截图较慢，在后台线程中用QImage完成
+            self._preview_executor.submit(self._scale_preview, self.preview_token,
+                                          pixmap.toImage(), current_width, current_height)
+        else:
+            # 调整图像大小以适应预览区域
+            preview_pixmap = pixmap.scaled(
+                current_width, 
+                current_height,
+                Qt.KeepAspectRatio, 
+                Qt.SmoothTransformation
+            )
+            
+            logger.debug("缩放后的预览图像尺寸: %sx%s", preview_pixmap.width(), preview_pixmap.height())
             
-        # 设置预览图像
-        self.preview_label.setPixmap(preview_pixmap)
+            # 设置预览图像
+            self.preview_label.setPixmap(preview_pixmap)
         
         # 如果需要更新索引，则设置为最新截图的索引
         if update_index and self.screenshot_manager.screenshots:
             old_index = self.current_screenshot_index
             self.current_screenshot_index = len(self.screenshot_manager.screenshots) - 1
-            logger.debug(f"更新当前索引: {old_index} -> {self.current_screenshot_index}")
+            logger.debug("更新当前索引: %s -> %s", old_index, self.current_screenshot_index)
             
         # 确保预览标签更新
         self.preview_label.update()
@@ -834,7 +851,39 @@ class MainWindow(QMainWindow):
         # 确保预览标签大小不变
         self.preview_label.setFixedSize(current_width, current_height)
         
-        logger.debug(f"已更新预览区域，保持固定大小: {current_width}x{current_height}")
+        logger.debug("已更新预览区域，保持固定大小: %sx%s", current_width, current_height)
+    
+    def _scale_preview(self, token, image, width, height):
+        """
+        缩放预览图像，在后台线程中执行
+        
+        参数:
+            token: 整数，发起缩放时的预览请求序号
+            image: QImage对象，要缩放的截图
+            width: 整数，预览区域宽度
+            height: 整数，预览区域高度
+        """
+        try:
+            thumb = image.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            self.preview_ready_signal.emit(token, thumb)
+        except Exception as e:
+            logger.error(f"后台缩放预览图像时出错: {str(e)}")
+    
+    def _on_preview_ready(self, token, thumb):
+        """
+        显示后台缩放完成的预览图像
+        
+        参数:
+            token: 整数，发起缩放时的预览请求序号
+            thumb: QImage对象，缩放后的预览图像
+        """
+        # 缩放期间预览已被切换或清除，丢弃过期的结果
+        if token != self.preview_token:
+            logger.debug("丢弃过期的预览图像，请求序号: %s, 当前序号: %s", token, self.preview_token)
+            return
+        
+        self.preview_label.setPixmap(QPixmap.fromImage(thumb))
+        logger.debug("后台缩放的预览图像已显示，尺寸: %sx%s", thumb.width(), thumb.height())
     
     def create_word_doc(self):
         """
@@ -906,17 +955,17 @@ class MainWindow(QMainWindow):
         # 在非工作模式下处理左右方向键
         elif not self.is_working_mode and self.isVisible():
             if event.key() == Qt.Key_Left:
-                logger.debug(f"按下左方向键，显示上一张截图，当前工作模式: {self.is_working_mode}, 窗口可见: {self.isVisible()}")
-                logger.debug(f"当前截图数量: {len(self.screenshot_manager.screenshots)}, 当前索引: {self.current_screenshot_index}")
+                logger.debug("按下左方向键，显示上一张截图，当前工作模式: %s, 窗口可见: %s", self.is_working_mode, self.isVisible())
+                logger.debug("当前截图数量: %s, 当前索引: %s", len(self.screenshot_manager.screenshots), self.current_screenshot_index)
                 self.show_previous_screenshot()
             elif event.key() == Qt.Key_Right:
-                logger.debug(f"按下右方向键，显示下一张截图，当前工作模式: {self.is_working_mode}, 窗口可见: {self.isVisible()}")
-                logger.debug(f"当前截图数量: {len(self.screenshot_manager.screenshots)}, 当前索引: {self.current_screenshot_index}")
+                logger.debug("按下右方向键，显示下一张截图，当前工作模式: %s, 窗口可见: %s", self.is_working_mode, self.isVisible())
+                logger.debug("当前截图数量: %s, 当前索引: %s", len(self.screenshot_manager.screenshots), self.current_screenshot_index)
                 self.show_next_screenshot()
             else:
                 super().keyPressEvent(event)
         else:
-            logger.debug(f"按键事件未处理，键值: {event.key()}, 当前工作模式: {self.is_working_mode}, 窗口可见: {self.isVisible()}")
+            logger.debug("按键事件未处理，键值: %s, 当前工作模式: %s, 窗口可见: %s", event.key(), self.is_working_mode, self.isVisible())
             super().keyPressEvent(event)
             
         # 记录截图状态
@@ -1007,28 +1056,31 @@ class MainWindow(QMainWindow):
         else:
             self.current_screenshot_index -= 1
             
-        logger.debug(f"切换截图索引: {old_index} -> {self.current_screenshot_index}")
+        logger.debug("切换截图索引: %s -> %s", old_index, self.current_screenshot_index)
             
         # 显示当前索引的截图
         pixmap = self.screenshot_manager.screenshots[self.current_screenshot_index]
-        logger.debug(f"获取到截图，尺寸: {pixmap.width()}x{pixmap.height()}")
+        logger.debug("获取到截图，尺寸: %sx%s", pixmap.width(), pixmap.height())
         
-        # 记录预览前的状态
-        logger.debug(f"显示预览前，预览标签状态: 有像素图={self.preview_label.pixmap() is not None}")
-        if self.preview_label.pixmap():
-            logger.debug(f"当前预览图像尺寸: {self.preview_label.pixmap().width()}x{self.preview_label.pixmap().height()}")
+        # 记录预览前的状态（只在输出调试日志时读取预览标签）
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            logger.debug("显示预览前，预览标签状态: 有像素图=%s", self.preview_label.pixmap() is not None)
+            if self.preview_label.pixmap():
+                logger.debug("当前预览图像尺寸: %sx%s", self.preview_label.pixmap().width(), self.preview_label.pixmap().height())
         
         # 显示预览
         self.show_preview(pixmap)
         
         # 记录预览后的状态
-        logger.debug(f"显示预览后，预览标签状态: 有像素图={self.preview_label.pixmap() is not None}")
-        if self.preview_label.pixmap():
-            logger.debug(f"更新后预览图像尺寸: {self.preview_label.pixmap().width()}x{self.preview_label.pixmap().height()}")
+        if debug_enabled:
+            logger.debug("显示预览后，预览标签状态: 有像素图=%s", self.preview_label.pixmap() is not None)
+            if self.preview_label.pixmap():
+                logger.debug("更新后预览图像尺寸: %sx%s", self.preview_label.pixmap().width(), self.preview_label.pixmap().height())
         
         # 更新状态栏
         self.status_label.setText(f'显示第 {self.current_screenshot_index + 1}/{len(self.screenshot_manager.screenshots)} 张截图')
-        logger.debug(f"显示上一张截图完成，当前索引: {self.current_screenshot_index}")
+        logger.debug("显示上一张截图完成，当前索引: %s", self.current_screenshot_index)
     
     def show_next_screenshot(self):
         """
@@ -1046,28 +1098,31 @@ class MainWindow(QMainWindow):
         else:
             self.current_screenshot_index += 1
             
-        logger.debug(f"切换截图索引: {old_index} -> {self.current_screenshot_index}")
+        logger.debug("切换截图索引: %s -> %s", old_index, self.current_screenshot_index)
             
         # 显示当前索引的截图
         pixmap = self.screenshot_manager.screenshots[self.current_screenshot_index]
-        logger.debug(f"获取到截图，尺寸: {pixmap.width()}x{pixmap.height()}")
+        logger.debug("获取到截图，尺寸: %sx%s", pixmap.width(), pixmap.height())
         
-        # 记录预览前的状态
-        logger.debug(f"显示预览前，预览标签状态: 有像素图={self.preview_label.pixmap() is not None}")
-        if self.preview_label.pixmap():
-            logger.debug(f"当前预览图像尺寸: {self.preview_label.pixmap().width()}x{self.preview_label.pixmap().height()}")
+        # 记录预览前的状态（只在输出调试日志时读取预览标签）
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            logger.debug("显示预览前，预览标签状态: 有像素图=%s", self.preview_label.pixmap() is not None)
+            if self.preview_label.pixmap():
+                logger.debug("当前预览图像尺寸: %sx%s", self.preview_label.pixmap().width(), self.preview_label.pixmap().height())
         
         # 显示预览
         self.show_preview(pixmap)
         
         # 记录预览后的状态
-        logger.debug(f"显示预览后，预览标签状态: 有像素图={self.preview_label.pixmap() is not None}")
-        if self.preview_label.pixmap():
-            logger.debug(f"更新后预览图像尺寸: {self.preview_label.pixmap().width()}x{self.preview_label.pixmap().height()}")
+        if debug_enabled:
+            logger.debug("显示预览后，预览标签状态: 有像素图=%s", self.preview_label.pixmap() is not None)
+            if self.preview_label.pixmap():
+                logger.debug("更新后预览图像尺寸: %sx%s", self.preview_label.pixmap().width(), self.preview_label.pixmap().height())
         
         # 更新状态栏
         self.status_label.setText(f'显示第 {self.current_screenshot_index + 1}/{len(self.screenshot_manager.screenshots)} 张截图')
-        logger.debug(f"显示下一张截图完成，当前索引: {self.current_screenshot_index}")
+        logger.debug("显示下一张截图完成，当前索引: %s", self.current_screenshot_index)
     
     def set_window_topmost(self, window):
         """
@@ -1151,10 +1206,12 @@ class MainWindow(QMainWindow):
         参数:
             context: 上下文信息，用于标识日志来源
         """
-        logger.debug(f"{context} - 截图列表状态: 数量={len(self.screenshot_manager.screenshots)}, 当前索引={self.current_screenshot_index}")
-        if self.screenshot_manager.screenshots:
-            for i, pixmap in enumerate(self.screenshot_manager.screenshots):
-                logger.debug(f"  截图[{i}]: 尺寸={pixmap.width()}x{pixmap.height()}, {'当前' if i == self.current_screenshot_index else ''}") 
+        # 未启用调试日志时直接返回，避免遍历截图列表
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        logger.debug("%s - 截图列表状态: 数量=%d, 当前索引=%d", context, len(self.screenshot_manager.screenshots), self.current_screenshot_index)
+        for i, pixmap in enumerate(self.screenshot_manager.screenshots):
+            logger.debug("  截图[%d]: 尺寸=%dx%d, %s", i, pixmap.width(), pixmap.height(), '当前' if i == self.current_screenshot_index else '')
     
     def eventFilter(self, obj, event):
         """
@@ -1188,7 +1245,7 @@ class MainWindow(QMainWindow):
                 
             # 获取当前显示的截图
             pixmap = self.screenshot_manager.screenshots[self.current_screenshot_index]
-            logger.debug(f"准备全屏显示截图，索引: {self.current_screenshot_index}, 尺寸: {pixmap.width()}x{pixmap.height()}")
+            logger.debug("准备全屏显示截图，索引: %s, 尺寸: %sx%s", self.current_screenshot_index, pixmap.width(), pixmap.height())
             
             # 创建并显示全屏图片查看器，传递当前索引和总数
             total_screenshots = len(self.screenshot_manager.screenshots)
@@ -1238,12 +1295,10 @@ class MainWindow(QMainWindow):
                     # 全屏截图模式
                     logger.debug("自动保存模式 - 全屏截图")
                     # 获取全屏截图
-                    screen = QApplication.primaryScreen()
-                    if not screen:
-                        logger.error("无法获取主屏幕")
+                    pixmap = self.screenshot_manager.grab_screen()
+                    if pixmap is None:
                         return
                         
-                    pixmap = screen.grabWindow(0)
                     if pixmap and not pixmap.isNull():
                         # 自动保存截图
                         logger.debug("获取到全屏截图，准备自动保存")
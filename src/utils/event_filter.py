@@ -36,7 +36,7 @@ class GlobalEventFilter(QObject):
             bool: 如果事件被处理则返回True，否则返回False
         """
         if event.type() == QEvent.KeyPress:
-            logger.debug(f"捕获按键事件: {event.key()}, modifiers: {event.modifiers()}")
+            logger.debug("捕获按键事件: %s, modifiers: %s", event.key(), event.modifiers())
             
             # 处理ESC键，用于退出特殊模式
             if event.key() == Qt.Key_Escape:
@@ -55,7 +55,7 @@ class GlobalEventFilter(QObject):
             
             # 处理左右方向键，用于切换截图
             elif event.key() == Qt.Key_Left or event.key() == Qt.Key_Right:
-                logger.debug(f"全局事件过滤器捕获到方向键: {event.key()}")
+                logger.debug("全局事件过滤器捕获到方向键: %s", event.key())
                 if self.parent and not self.parent.is_working_mode and self.parent.isVisible():
                     # 将事件传递给主窗口的keyPressEvent方法
                     self.parent.keyPressEvent(event)
@@ -65,7 +65,7 @@ class GlobalEventFilter(QObject):
             # 注意：F11键已经由热键管理器处理，这里不再重复处理
             # 为了避免重复触发，我们在这里直接返回True，表示事件已处理
             elif event.key() == Qt.Key_F11:
-                logger.debug(f"全局事件过滤器捕获到F11键，但由热键管理器处理，不再重复处理")
+                logger.debug("全局事件过滤器捕获到F11键，但由热键管理器处理，不再重复处理")
                 return True
                 
         # 对于未处理的事件，调用基类方法
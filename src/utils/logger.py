@@ -4,8 +4,62 @@
 """
 
 import sys
+import time
 import logging
 
+class BufferedFileHandler(logging.FileHandler):
+    """
+    带缓冲的文件日志处理器
+    普通日志先写入缓冲区，以下任一条件满足时刷新到磁盘：
+    达到指定级别的日志、距上次刷新超过指定时间、缓冲区写满（由文件缓冲自动写出）。
+    程序异常崩溃时最多丢失最近flush_interval秒内的普通日志
+    """
+    
+    def __init__(self, filename, encoding=None, buffer_size=65536, flush_level=logging.WARNING,
+                 flush_interval=1.0):
+        """
+        初始化带缓冲的文件日志处理器
+        
+        参数:
+            filename: 日志文件路径
+            encoding: 文件编码
+            buffer_size: 文件缓冲区大小（字节），写满后自动写入磁盘
+            flush_level: 达到该级别的日志会立即刷新到磁盘
+            flush_interval: 距上次刷新超过该时间（秒）时，下一条日志写入后刷新
+        """
+        self.buffer_size = buffer_size
+        self.flush_level = flush_level
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+        super().__init__(filename, encoding=encoding)
+    
+    def _open(self):
+        """
+        以指定的缓冲区大小打开日志文件
+        """
+        # FileHandler从Python 3.9起才有errors属性
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                    encoding=self.encoding, errors=getattr(self, 'errors', None))
+    
+    def emit(self, record):
+        """
+        写入一条日志记录，级别足够高或距上次刷新时间过长时刷新
+        
+        参数:
+            record: 日志记录对象
+        """
+        try:
+            msg = self.format(record)
+            self.stream.write(msg + self.terminator)
+            now = time.monotonic()
+            if record.levelno >= self.flush_level or now - self._last_flush >= self.flush_interval:
+                self.flush()
+                self._last_flush = now
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
 def setup_logger():
     """
     配置并初始化日志系统
@@ -21,8 +75,8 @@ def setup_logger():
     if logger.handlers:
         logger.handlers.clear()
     
-    # 创建文件处理器，设置编码为utf-8
-    file_handler = logging.FileHandler('screenshot_tool.log', encoding='utf-8')
+    # 创建带缓冲的文件处理器，设置编码为utf-8
+    file_handler = BufferedFileHandler('screenshot_tool.log', encoding='utf-8')
     file_handler.setLevel(logging.DEBUG)
     
     # 创建控制台处理器
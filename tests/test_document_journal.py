@@ -0,0 +1,75 @@
+"""
+截图日志恢复逻辑的测试
+"""
+
+import json
+import hashlib
+import unittest
+
+try:
+    from src.core.document_manager import _parse_journal, _journal_dir
+except ImportError:  # 未安装PyQt5时跳过
+    _parse_journal = None
+
+def _entry(name):
+    return json.dumps({'caption': '', 'image': f"{name}.png"})
+
+def _marker(saved, digest):
+    return json.dumps({'saved': saved, 'digest': digest.hex()})
+
+@unittest.skipIf(_parse_journal is None, "需要PyQt5")
+class ParseJournalTest(unittest.TestCase):
+    """
+    _parse_journal根据保存标记跳过已写入文档的截图
+    """
+
+    def setUp(self):
+        self.saved_digest = hashlib.blake2b(b"saved", digest_size=16).digest()
+        self.old_digest = hashlib.blake2b(b"old", digest_size=16).digest()
+
+    def _images(self, entries):
+        return [entry['image'] for entry in entries]
+
+    def test_no_marker_recovers_all(self):
+        lines = [_entry('a'), _entry('b')]
+        self.assertEqual(self._images(_parse_journal(lines, self.old_digest)), ['a.png', 'b.png'])
+
+    def test_marker_matching_document_skips_saved(self):
+        # 替换完成后、重写日志前崩溃：文档已包含前两张截图
+        lines = [_entry('a'), _entry('b'), _marker(2, self.saved_digest), _entry('c')]
+        self.assertEqual(self._images(_parse_journal(lines, self.saved_digest)), ['c.png'])
+
+    def test_marker_not_matching_document_is_ignored(self):
+        # 替换前崩溃：文档仍是旧版本，所有截图都需要恢复
+        lines = [_entry('a'), _entry('b'), _marker(2, self.saved_digest)]
+        self.assertEqual(self._images(_parse_journal(lines, self.old_digest)), ['a.png', 'b.png'])
+
+    def test_unknown_document_digest_recovers_all(self):
+        lines = [_entry('a'), _marker(1, self.saved_digest)]
+        self.assertEqual(self._images(_parse_journal(lines, None)), ['a.png'])
+
+    def test_invalid_line_is_skipped(self):
+        lines = [_entry('a'), '{broken', _entry('b')]
+        self.assertEqual(self._images(_parse_journal(lines, None)), ['a.png', 'b.png'])
+
+    def test_crash_between_replace_and_rewrite_after_recovery(self):
+        # 上次崩溃留下的日志：a、b已保存（标记与文档一致），c未保存
+        lines = [_entry('a'), _entry('b'), _marker(2, self.old_digest), _entry('c')]
+        recovered = _parse_journal(lines, self.old_digest)
+        self.assertEqual(self._images(recovered), ['c.png'])
+
+        # 恢复后先按恢复的截图重写日志，再保存；保存时在替换文件前写入标记，
+        # 替换完成后、重写日志前再次崩溃
+        lines = [json.dumps(entry) for entry in recovered] + [_marker(1, self.saved_digest)]
+
+        # 文档已是新版本，c已写入文档，不应再次恢复任何截图
+        self.assertEqual(_parse_journal(lines, self.saved_digest), [])
+        # 替换未完成时文档仍是旧版本，c需要再次恢复
+        self.assertEqual(self._images(_parse_journal(lines, self.old_digest)), ['c.png'])
+
+    def test_journal_dir_depends_on_document_path(self):
+        self.assertNotEqual(_journal_dir('/tmp/a.docx'), _journal_dir('/tmp/b.docx'))
+        self.assertEqual(_journal_dir('/tmp/a.docx'), _journal_dir('/tmp/../tmp/a.docx'))
+
+if __name__ == '__main__':
+    unittest.main()